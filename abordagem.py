@@ -1,25 +1,88 @@
+from __future__ import annotations  # anotações com pd.* não disparam o import preguiçoso
+
+import time
+_T0 = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+import importlib
 from datetime import datetime, date
 from zoneinfo import ZoneInfo
 import re
+import os
+import sys
+import math
+import json
+import zlib
+import struct
 import base64
+import pickle
+import hashlib
+import io
+import zipfile
 import unicodedata
+import threading
+import functools
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, List
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# --- IMPORTS PREGUIÇOSOS ---
+# pandas/numpy só carregam quando uma tela precisa deles (a seleção de evento não precisa) ou pelo
+# aquecimento em segundo plano; gspread/google-auth só dentro de obter_cliente_gspread.
+@st.cache_resource(show_spinner=False)
+def _perfil_processo() -> Dict:
+    """Custos de inicialização do processo (ms), exibidos no painel ?perfil=1"""
+    return {"trava": threading.Lock(), "etapas": {}}
+
+def _registrar_custo(etapa: str, inicio: float):
+    perfil = _perfil_processo()
+    with perfil["trava"]:
+        perfil["etapas"].setdefault(etapa, round((time.perf_counter() - inicio) * 1000, 1))
+
+class _ModuloPreguicoso:
+    """Importa o módulo no primeiro atributo pedido e se troca por ele nos globais do script"""
+    def __init__(self, nome: str, apelido: str):
+        self._nome, self._apelido = nome, apelido
+
+    def __getattr__(self, atributo):
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(self._nome)  # o lock de import do Python serializa threads concorrentes
+        _registrar_custo(f"import {self._nome}", inicio)
+        globals()[self._apelido] = modulo
+        return getattr(modulo, atributo)
+
+pd = _ModuloPreguicoso("pandas", "pd")
+np = _ModuloPreguicoso("numpy", "np")
+
+_PERFIL_EXECUCAO = [("imports", round((time.perf_counter() - _T0) * 1000, 1))]
+
+def _marcar(etapa: str):
+    """Marca o tempo (ms desde o início desta execução do script) para o painel de perfil"""
+    _PERFIL_EXECUCAO.append((etapa, round((time.perf_counter() - _T0) * 1000, 1)))
 
 # ================= AJUSTES RÁPIDOS (estilo) =================
 BTN_HEIGHT = "3.8em"   # Altura de TODOS os botões
 BTN_GAP    = "0px"      # Espaçamento vertical unificado
-ABAS_SISTEMA = ["PAINEL", "Abordagem", "Tabela UTE", "Escala", "LISTAS"] 
+ABAS_SISTEMA = ["PAINEL", "Abordagem", "Tabela UTE", "Escala", "LISTAS", "CONFIG"] 
 # ============================================================
 
 # --- CONFIG DA PÁGINA ---
+@st.cache_resource(show_spinner=False)
+def _icone_pagina():
+    """Favicon reduzido uma vez por processo: com o PNG original (2098x2048) o Streamlit redimensionava a cada rerun"""
+    try:
+        from PIL import Image
+        icone = Image.open("anatel.png")
+        icone.thumbnail((64, 64))
+        return icone
+    except Exception:
+        return "anatel.png"
+
 st.set_page_config(
     page_title="AppEventos",
-    page_icon="anatel.png",
+    page_icon=_icone_pagina(),
     layout="centered",
     initial_sidebar_state="collapsed"
 )
@@ -27,6 +90,8 @@ st.set_page_config(
 # --- CONSTANTES ---
 TITULO_PRINCIPAL = "AppEventos"
 OBRIG = ":red[**\\***]"
+BUSCA_POR_PAGINA = 25   # Resultados por página na pesquisa (limita widgets por rerun)
+PLACAR_INTERVALO_S = 15  # de quanto em quanto tempo o contador do menu se atualiza sozinho
 
 # --- HELPER: NORMALIZAR TEXTO ---
 def _normalize_text(s: str) -> str:
@@ -37,30 +102,26 @@ def _normalize_text(s: str) -> str:
     return s.strip().lower()
 
 # --- MAPA DA CIDADE (Busca Dinâmica de Coordenadas) ---
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_city_map_url(_client, spreadsheet_id):
-    """Busca lat/long nas células AE3/AE4 de qualquer aba de estação e retorna URL do Maps"""
+    """Busca lat/long nas células do layout (padrão AE3/AE4) da primeira aba de estação e retorna URL do Maps"""
     try:
-        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        # Tenta encontrar a primeira aba que não seja de sistema para colher a coordenada central
-        abas_estacoes = [ws for ws in planilha.worksheets() if ws.title not in ABAS_SISTEMA]
-        
-        if abas_estacoes:
-            aba = abas_estacoes[0]
-            # Busca Lat em AE3 (Linha 3, Col 31) e Long em AE4 (Linha 4, Col 31)
-            lat = aba.cell(3, 31).value
-            lon = aba.cell(4, 31).value
-            
-            if lat and lon:
-                # Limpa possíveis espaços ou vírgulas
-                lat = str(lat).replace(',', '.').strip()
-                lon = str(lon).replace(',', '.').strip()
-                return f"https://www.google.com/maps/search/?api=1&query={lat},{lon}"
+        lat, lon = _coordenadas_evento(_client, spreadsheet_id)
+        if lat and lon:
+            # Limpa possíveis espaços ou vírgulas
+            lat = str(lat).replace(',', '.').strip()
+            lon = str(lon).replace(',', '.').strip()
+            return f"https://www.google.com/maps/search/?api=1&query={lat},{lon}"
     except:
         pass
         
     # Fallback caso não encontre coordenadas
     return "https://www.google.com/maps"
 
+# Campos que a tela de tratamento edita (nomes padronizados das cargas de pendências)
+CAMPOS_EDITAVEIS = ["Identificação", "Autorizado?", "UTE?", "Processo SEI UTE", "Ocorrência (observações)",
+                    "Alguém mais ciente?", "Interferente?", "Situação"]
+
 IDENT_OPCOES = ["Sinal de dados", "Comunicação relacionada ao evento", "Comunicação não relacionada ao evento", "Espúrio ou Produto de Intermodulação", "Ruído", "Não identificado",]
 
 FAIXA_OPCOES = ["FM", "SMA", "SMM", "SLP", "TV", "SMP", "GNSS", "Satélite", "Radiação Restrita"]
@@ -68,35 +129,68 @@ FAIXA_OPCOES = ["FM", "SMA", "SMM", "SLP", "TV", "SMP", "GNSS", "Satélite", "Ra
 # --- CONEXÃO GSPREAD ---
 @st.cache_resource(ttl=3600, show_spinner=False)
 def obter_cliente_gspread():
+    inicio = time.perf_counter()
     try:
+        import gspread
+        from google.oauth2.service_account import Credentials
+        _registrar_custo("import gspread + google-auth", inicio)
+
         info = st.secrets["gcp_service_account"]
         creds = Credentials.from_service_account_info(info, scopes=[
             "https://www.googleapis.com/auth/spreadsheets",
             "https://www.googleapis.com/auth/drive"
         ])
-        return gspread.authorize(creds)
+        cliente = gspread.authorize(creds)
+        _registrar_custo("cliente gspread", inicio)
+        return cliente
     except Exception as e:
         st.error(f"Erro na autenticação: {e}")
         return None
 
+# --- EXECUÇÃO CONCORRENTE ---
+@st.cache_resource(show_spinner=False)
+def _obter_executor():
+    """Pool de threads compartilhado por todas as sessões (cargas de rede em paralelo)"""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="appeventos")
+
+@st.cache_resource(show_spinner=False)
+def _obter_executor_painel():
+    """Pool próprio do painel multi-eventos: as extrações completas não ocupam o pool das telas de trabalho"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="appeventos-painel")
+
+def _submeter(fn, *args, executor=None):
+    """Agenda fn(*args) no pool (o compartilhado, se `executor` não vier), levando junto o contexto da sessão (necessário para st.cache_*)"""
+    ctx = get_script_run_ctx()
+    def _tarefa():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    return (executor or _obter_executor()).submit(_tarefa)
+
 # --- BUSCA DE PLANILHAS ---
+@st.cache_data(ttl=120, show_spinner=False)
+def _listar_eventos_drive(_client) -> List[Dict[str, str]]:
+    eventos = []
+    termo = "monitoracao"
+    
+    for arq in _client.list_spreadsheet_files():
+        nome_real = arq['name']
+        nome_norm = ''.join(c for c in unicodedata.normalize('NFD', nome_real) if unicodedata.category(c) != 'Mn').lower()
+        
+        if termo in nome_norm:
+            nome_exibicao = nome_real.replace("Monitoração - ", "").replace("Monitoracao - ", "").replace("MONITORAÇÃO - ", "")
+            eventos.append({"nome": nome_exibicao, "id": arq['id'], "modificado": arq.get('modifiedTime', "")})
+    _submeter(_gravar_snapshot, "eventos", "", eventos)
+    return eventos
+
+def listar_eventos(_client) -> List[Dict[str, str]]:
+    """Planilhas de 'Monitoração' visíveis à conta: [{'nome', 'id', 'modificado'}]. No boot vem do disco e revalida em 2º plano."""
+    return _com_snapshot("eventos", None, lambda: _listar_eventos_drive(_client))
+
 def buscar_planilhas(client):
     if not client: return {}
     try:
-        arquivos = client.list_spreadsheet_files()
-        planilhas = {}
-        termo = "monitoracao"
-        
-        for arq in arquivos:
-            nome_real = arq['name']
-            file_id = arq['id']
-            nome_norm = ''.join(c for c in unicodedata.normalize('NFD', nome_real) if unicodedata.category(c) != 'Mn').lower()
-            
-            if termo in nome_norm:
-                nome_exibicao = nome_real.replace("Monitoração - ", "").replace("Monitoracao - ", "").replace("MONITORAÇÃO - ", "")
-                planilhas[nome_exibicao] = file_id
-        
-        return planilhas
+        return {ev["nome"]: ev["id"] for ev in listar_eventos(client)}
     except Exception as e:
         st.error(f"Erro ao listar arquivos: {e}")
         return {}
@@ -104,18 +198,376 @@ def buscar_planilhas(client):
 def abrir_planilha_selecionada(_client, spreadsheet_id):
     return _client.open_by_key(spreadsheet_id)
 
+# --- FRESCOR DAS PLANILHAS ---
+@st.cache_data(ttl=10, show_spinner=False)
+def _versao_planilha(_client, spreadsheet_id) -> str:
+    """modifiedTime do Drive (uma chamada de metadados). Sem resposta, cai numa janela de 150 s como antes."""
+    try:
+        return _client.get_file_drive_metadata(spreadsheet_id)["modifiedTime"]
+    except Exception:
+        return f"janela-{int(time.time() // 150)}"
+
+def _invalidar_versao(_client=None, spreadsheet_id=None):
+    """
+    Chamado pelas rotinas de escrita: a próxima leitura do evento já consulta a versão nova. O probe do Drive
+    e o agendamento da recontagem do placar vão para o pool, fora do caminho do salvamento.
+    """
+    if not spreadsheet_id:
+        _versao_planilha.clear()
+        return
+    _versao_planilha.clear(_client, spreadsheet_id)
+    _submeter(_placar_atual, _client, spreadsheet_id)
+
+# --- SNAPSHOTS EM DISCO ---
+# Cópia local dos caches versionados e do catálogo de eventos, para o processo novo (restart/redeploy)
+# não começar do zero. FORMATO_SNAPSHOT muda sempre que o formato dos dados em cache mudar.
+# Cada arquivo é uma linha JSON de cabeçalho (formato, chave, versão) seguida do pickle do valor: o
+# cabeçalho decide se o valor serve antes de qualquer desserialização.
+FORMATO_SNAPSHOT = 2
+DIR_SNAPSHOTS = Path(os.environ.get("APPEVENTOS_SNAPSHOTS", Path.home() / ".cache" / "appeventos" / "snapshots"))
+_contexto_leitura = threading.local()
+
+def _arquivo_snapshot(chave: str) -> Path:
+    return DIR_SNAPSHOTS / (hashlib.sha1(chave.encode("utf-8")).hexdigest() + ".pkl")
+
+def _dir_snapshots_confiavel() -> bool:
+    """Só desserializa de diretório do próprio usuário do processo, sem escrita para grupo/outros"""
+    try:
+        info = DIR_SNAPSHOTS.stat()
+        return info.st_uid == os.getuid() and not (info.st_mode & 0o022)
+    except (OSError, AttributeError):
+        return False
+
+def _ler_snapshot(chave: str, versao: Optional[str] = None, exceto_versao: Optional[str] = None) -> Optional[Dict]:
+    """
+    {'versao', 'valor'} salvo para a chave, ou None (ausente, corrompido, de outro formato ou diretório
+    inseguro). Com `versao`, só serve essa versão; com `exceto_versao`, só uma diferente dela. O filtro
+    é decidido pelo cabeçalho, sem desserializar o valor.
+    """
+    if not _dir_snapshots_confiavel(): return None
+    try:
+        with open(_arquivo_snapshot(chave), "rb") as f:
+            cab = json.loads(f.readline())
+            if cab.get("formato") != FORMATO_SNAPSHOT or cab.get("chave") != chave: return None
+            if versao is not None and cab.get("versao") != versao: return None
+            if exceto_versao is not None and cab.get("versao") == exceto_versao: return None
+            return {"versao": cab["versao"], "valor": pickle.load(f)}
+    except Exception:
+        return None
+
+def _gravar_snapshot(chave: str, versao: str, valor):
+    """Grava atomicamente (arquivo temporário + rename); disco indisponível não atrapalha a leitura"""
+    try:
+        DIR_SNAPSHOTS.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _dir_snapshots_confiavel(): return
+        destino = _arquivo_snapshot(chave)
+        tmp = destino.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(json.dumps({"formato": FORMATO_SNAPSHOT, "chave": chave, "versao": versao}).encode("utf-8") + b"\n")
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, destino)
+    except Exception:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def _estado_snapshots() -> Dict:
+    """Chaves já servidas neste processo e revalidações em curso: {chave: (futuro, valor do disco)}"""
+    return {"trava": threading.Lock(), "vistas": set(), "revalidando": {}}
+
+def _revalidar(carregar):
+    _contexto_leitura.sem_desatualizado = True
+    try:
+        return carregar()
+    finally:
+        _contexto_leitura.sem_desatualizado = False
+
+def _com_snapshot(chave: str, versao: Optional[str], carregar):
+    """
+    Stale-while-revalidate só no primeiro acesso do processo: se o disco tem a chave numa versão diferente
+    de `versao`, devolve o valor do disco e agenda carregar() no pool; até ele terminar, as chamadas seguintes
+    continuam recebendo o valor do disco. Cargas internas (e o recálculo em 2º plano) sempre leem o atual.
+    """
+    # Cargas internas e recálculos nunca recebem o valor antigo (nem o do disco, nem o de uma revalidação
+    # em curso): senão o resultado composto seria montado com dados velhos e guardado sob a versão nova
+    if getattr(_contexto_leitura, "sem_desatualizado", False): return carregar()
+
+    estado = _estado_snapshots()
+    with estado["trava"]:
+        em_curso = estado["revalidando"].get(chave)
+        if em_curso and not em_curso[0].done(): return em_curso[1]
+        estado["revalidando"].pop(chave, None)
+        primeira = chave not in estado["vistas"]
+        estado["vistas"].add(chave)
+
+    if primeira:
+        # Snapshot da versão atual fica para _carregar (única leitura do disco); aqui só o desatualizado
+        snap = _ler_snapshot(chave, exceto_versao=versao)
+        if snap is not None:
+            with estado["trava"]:
+                estado["revalidando"][chave] = (_submeter(_revalidar, carregar), snap["valor"])
+            return snap["valor"]
+    return carregar()
+
+# --- MEMÓRIA DOS CACHES VERSIONADOS ---
+# Um servidor pequeno atende vários eventos no mesmo fim de semana: os resultados ficam num único
+# depósito do processo, com teto de memória total, por tipo de dado e de eventos residentes.
+CACHE_LIMITE_MB = float(os.environ.get("APPEVENTOS_CACHE_MB", 512))
+CACHE_EVENTOS_RESIDENTES = max(1, int(os.environ.get("APPEVENTOS_CACHE_EVENTOS", 4)))
+CACHE_LIMITE_TIPO = {           # fração de CACHE_LIMITE_MB que cada tipo pode ocupar
+    "estacoes": 0.35, "busca": 0.30, "exportacao": 0.25, "espectro": 0.15, "ute": 0.05, "estrutura": 0.05,
+    "painel": 0.05,             # cargas do painel multi-eventos: não tornam o evento residente
+}
+
+@st.cache_resource(show_spinner=False)
+def _memoria_caches() -> Dict:
+    """
+    Depósito dos caches versionados, do menos para o mais recentemente usado:
+    {chave: {'funcao', 'tipo', 'evento', 'versao', 'valor', 'bytes', 'expira'}}; uma entrada por chave,
+    a versão nova substitui a anterior. 'eventos' guarda a ordem de uso interativo dos spreadsheet_id
+    (entradas do tipo 'painel' ficam fora dela e só saem pelo TTL e pelos tetos de memória).
+    """
+    return {"trava": threading.Lock(), "travas": {}, "entradas": OrderedDict(), "eventos": OrderedDict(),
+            "bytes": Counter(), "acertos": 0, "faltas": 0, "despejos": Counter()}
+
+def _tamanho_estimado(valor, _nivel: int = 0) -> int:
+    """Bytes aproximados de um valor em cache (DataFrames/Series pelo memory_usage profundo)"""
+    modulo = type(valor).__module__
+    if modulo.startswith("pandas"):
+        uso = valor.memory_usage(index=True, deep=True)
+        return int(uso.sum() if hasattr(uso, "sum") else uso)
+    if modulo == "numpy" and hasattr(valor, "nbytes"):
+        extra = sum(sys.getsizeof(v) for v in valor.ravel()) if valor.dtype == object else 0
+        return int(valor.nbytes) + extra
+    tamanho = sys.getsizeof(valor)
+    if _nivel < 4:
+        if isinstance(valor, dict):
+            tamanho += sum(_tamanho_estimado(k, _nivel + 1) + _tamanho_estimado(v, _nivel + 1) for k, v in valor.items())
+        elif isinstance(valor, (list, tuple, set)):
+            tamanho += sum(_tamanho_estimado(v, _nivel + 1) for v in valor)
+    return tamanho
+
+def _remover_entrada(mem: Dict, chave: str, motivo: str):
+    e = mem["entradas"].pop(chave)
+    mem["bytes"][(e["evento"], e["tipo"])] -= e["bytes"]
+    if mem["bytes"][(e["evento"], e["tipo"])] <= 0: del mem["bytes"][(e["evento"], e["tipo"])]
+    if not any(ev == e["evento"] and tipo != "painel" for ev, tipo in mem["bytes"]): mem["eventos"].pop(e["evento"], None)
+    mem["despejos"][motivo] += 1
+
+def _tornar_residente(mem: Dict, chave: str, tipo: str):
+    """Uso interativo: a entrada (se veio do painel, passa ao tipo real) e o seu evento vão para o fim da fila"""
+    e = mem["entradas"][chave]
+    if e["tipo"] == "painel" and tipo != "painel":
+        mem["bytes"][(e["evento"], "painel")] -= e["bytes"]
+        if mem["bytes"][(e["evento"], "painel")] <= 0: del mem["bytes"][(e["evento"], "painel")]
+        mem["bytes"][(e["evento"], tipo)] += e["bytes"]
+        e["tipo"] = tipo
+    mem["entradas"].move_to_end(chave)
+    if e["tipo"] != "painel":
+        mem["eventos"][e["evento"]] = None
+        mem["eventos"].move_to_end(e["evento"])
+
+def _aplicar_limites(mem: Dict, protegida: str):
+    """Despeja, do menos para o mais recentemente usado, até caber nos tetos (nunca a entrada recém-gravada)"""
+    agora = time.time()
+    limite = CACHE_LIMITE_MB * 2**20
+    evento_atual = mem["entradas"][protegida]["evento"]
+
+    # 1. Eventos demais: os menos usados saem inteiros (menos o que veio do painel, que tem teto próprio)
+    while len(mem["eventos"]) > CACHE_EVENTOS_RESIDENTES:
+        antigo = next(ev for ev in mem["eventos"] if ev != evento_atual)
+        for chave in [c for c, e in mem["entradas"].items() if e["evento"] == antigo and e["tipo"] != "painel"]:
+            _remover_entrada(mem, chave, "evento")
+        mem["eventos"].pop(antigo, None)
+
+    # 2. Vencidas pelo TTL, tipo acima da sua fração e total acima do teto
+    por_tipo = Counter()
+    for (_, tipo), n in mem["bytes"].items(): por_tipo[tipo] += n
+    total = sum(por_tipo.values())
+    for chave in list(mem["entradas"]):
+        if chave == protegida: continue
+        e = mem["entradas"][chave]
+        if e["expira"] < agora: motivo = "ttl"
+        elif por_tipo[e["tipo"]] > CACHE_LIMITE_TIPO.get(e["tipo"], 1.0) * limite: motivo = "tipo"
+        elif total > limite: motivo = "total"
+        else: continue
+        por_tipo[e["tipo"]] -= e["bytes"]
+        total -= e["bytes"]
+        _remover_entrada(mem, chave, motivo)
+
+def _cache_memoria(chave: str, versao: str, funcao: str, tipo: str, evento: str, ttl: int, carregar):
+    """
+    Valor da chave na versão pedida: do depósito em memória ou de carregar(), que então é gravado
+    e dispara os despejos. Uma carga por chave por vez (as demais esperam e reaproveitam o resultado).
+    Dentro do painel multi-eventos (_contexto_leitura.painel) a entrada nova é do tipo 'painel'.
+    """
+    tipo_real = tipo
+    if getattr(_contexto_leitura, "painel", False): tipo = "painel"
+    mem = _memoria_caches()
+    with mem["trava"]:
+        trava_chave = mem["travas"].setdefault(chave, threading.Lock())
+    with trava_chave:
+        with mem["trava"]:
+            e = mem["entradas"].get(chave)
+            if e is not None and e["versao"] == versao and e["expira"] > time.time():
+                if tipo == "painel": mem["entradas"].move_to_end(chave)
+                else:
+                    novo_residente = evento not in mem["eventos"]
+                    _tornar_residente(mem, chave, tipo_real)
+                    if novo_residente: _aplicar_limites(mem, chave)
+                mem["acertos"] += 1
+                return e["valor"]
+            mem["faltas"] += 1
+
+        valor = carregar()
+        tamanho = _tamanho_estimado(valor)
+        with mem["trava"]:
+            if chave in mem["entradas"]: _remover_entrada(mem, chave, "versao")
+            mem["entradas"][chave] = {"funcao": funcao, "tipo": tipo, "evento": evento, "versao": versao,
+                                      "valor": valor, "bytes": tamanho, "expira": time.time() + ttl}
+            mem["bytes"][(evento, tipo)] += tamanho
+            _tornar_residente(mem, chave, tipo)
+            _aplicar_limites(mem, chave)
+        return valor
+
+def _limpar_cache_funcao(funcao: str):
+    mem = _memoria_caches()
+    with mem["trava"]:
+        for chave in [c for c, e in mem["entradas"].items() if e["funcao"] == funcao]:
+            _remover_entrada(mem, chave, "limpeza")
+
+def relatorio_memoria_caches() -> tuple:
+    """(DataFrame evento x tipo com entradas e MB, totais do depósito) para o painel de perfil"""
+    mem = _memoria_caches()
+    with mem["trava"]:
+        linhas = Counter()
+        for e in mem["entradas"].values(): linhas[(e["evento"], e["tipo"])] += 1
+        tabela = pd.DataFrame(
+            [{"Evento": ev, "Tipo": tipo, "Entradas": n, "MB": round(mem["bytes"][(ev, tipo)] / 2**20, 2)}
+             for (ev, tipo), n in linhas.items()],
+            columns=["Evento", "Tipo", "Entradas", "MB"])
+        totais = {"MB": round(sum(mem["bytes"].values()) / 2**20, 2), "acertos": mem["acertos"],
+                  "faltas": mem["faltas"], "despejos": dict(mem["despejos"])}
+    return tabela.sort_values(["Evento", "MB"], ascending=[True, False]), totais
+
+def _cache_versionado(ttl: int = 900, tipo: str = "estrutura"):
+    """
+    Como st.cache_data, mas a chave inclui a versão da planilha (_versao_planilha).
+    Ao vencer o probe, se ninguém mexeu na planilha o snapshot continua valendo e nada é recarregado;
+    o TTL fica só como teto de segurança. Os resultados ficam no depósito de memória limitado
+    (_cache_memoria, despejo por `tipo` e por evento) e também vão para o disco (ver _com_snapshot).
+    """
+    def decorar(fn):
+        def _carregar(_client, spreadsheet_id, versao, *args):
+            # Snapshot em disco da mesma versão (processo recém-iniciado): nada a ler da planilha
+            chave = f"{fn.__name__}|{spreadsheet_id}|{args!r}"
+            snap = _ler_snapshot(chave, versao)
+            if snap is not None: return snap["valor"]
+
+            anterior = getattr(_contexto_leitura, "sem_desatualizado", False)
+            _contexto_leitura.sem_desatualizado = True
+            try:
+                valor = fn(_client, spreadsheet_id, *args)
+            finally:
+                _contexto_leitura.sem_desatualizado = anterior
+            # A gravação em disco sai do caminho da requisição
+            _submeter(_gravar_snapshot, chave, versao, valor)
+            return valor
+        @functools.wraps(fn)
+        def wrapper(_client, spreadsheet_id, *args):
+            versao = _versao_planilha(_client, spreadsheet_id)
+            chave = f"{fn.__name__}|{spreadsheet_id}|{args!r}"
+            return _com_snapshot(chave, versao, lambda: _cache_memoria(
+                chave, versao, fn.__name__, tipo, spreadsheet_id, ttl,
+                lambda: _carregar(_client, spreadsheet_id, versao, *args)))
+        wrapper.clear = functools.partial(_limpar_cache_funcao, fn.__name__)
+        return wrapper
+    return decorar
+
+# --- LAYOUT DO EVENTO ---
+# Posições fixas da planilha-modelo. Um evento com layout diferente sobrescreve qualquer chave
+# numa aba CONFIG (coluna A = chave, coluna B = valor); abas_sistema aceita lista separada por vírgulas.
+LAYOUT_PADRAO = {
+    "abas_sistema": ABAS_SISTEMA,
+    "abordagem_dados": "H:W",           # bloco ID..Situação da Abordagem (ordem de COLS_ABORDAGEM_HW)
+    "abordagem_bsr": "X:AC",            # bloco BSR/ERB da Abordagem (ordem de COLS_ABORDAGEM_XAC)
+    "ute_col_entidade": "A",
+    "ute_col_local": "D",
+    "ute_col_freq": "E",
+    "ute_col_sei": "H",
+    "estacao_col_freq": "F",
+    "coord_lat": "AE3",
+    "coord_lon": "AE4",
+    "opcoes_identificacao": "AC2:AC7",
+    "estacao_linha_cabecalho": "",      # vazio = detecta nas 6 primeiras linhas
+}
+
+@_cache_versionado(ttl=3600)
+def carregar_layout_evento(_client, spreadsheet_id) -> Dict:
+    """
+    Layout da planilha: LAYOUT_PADRAO sobrescrito pela aba CONFIG, se existir.
+    Lido uma vez por versão da planilha, então editar a CONFIG vale no próximo probe, sem reiniciar o app.
+    """
+    layout = dict(LAYOUT_PADRAO)
+    try:
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        linhas = planilha.values_get(_intervalo("CONFIG", "A1:B")).get("values", [])
+    except Exception:
+        return layout
+
+    for row in linhas:
+        if len(row) < 2: continue
+        chave, valor = str(row[0]).strip().lower(), str(row[1]).strip()
+        if chave not in LAYOUT_PADRAO or not valor: continue
+        if chave == "abas_sistema":
+            layout[chave] = list(dict.fromkeys([a.strip() for a in valor.split(",") if a.strip()] + ["CONFIG"]))
+        else:
+            layout[chave] = valor.replace(" ", "").upper()
+    return layout
+
+def _bloco(intervalo: str) -> tuple:
+    """'H:W' -> ('H', 'W')"""
+    ini, fim = intervalo.split(":")
+    return ini, fim
+
+def _deslocar_coluna(letra: str, n: int) -> str:
+    return _col_letter(_col_to_index(letra) + n)
+
+def _colunas_abordagem(layout: Dict) -> Dict[str, str]:
+    """Letra de cada campo de COLS_ABORDAGEM_HW conforme o início do bloco de dados"""
+    ini, _ = _bloco(layout["abordagem_dados"])
+    return {nome: _deslocar_coluna(ini, i) for i, nome in enumerate(COLS_ABORDAGEM_HW)}
+
+def _coordenadas_evento(_client, spreadsheet_id) -> tuple:
+    """(lat, lon) crus das células do layout na primeira aba de estação, numa única leitura em lote"""
+    layout = carregar_layout_evento(_client, spreadsheet_id)
+    estacoes = listar_abas_estacoes(_client, spreadsheet_id)
+    if not estacoes: return None, None
+    planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+    resp = planilha.values_batch_get([_intervalo(estacoes[0], layout["coord_lat"]), _intervalo(estacoes[0], layout["coord_lon"])])
+    vals = [(vr.get("values") or [[None]])[0][0] for vr in resp.get("valueRanges", [])]
+    return (vals + [None, None])[:2]
+
+@st.cache_resource(show_spinner=False)
 def _img_b64(path: str) -> Optional[str]:
     p = Path(path)
     if not p.exists(): return None
     return base64.b64encode(p.read_bytes()).decode("utf-8")
 
 # --- LISTAR ABAS ---
-@st.cache_data(ttl=150, show_spinner=False)
+@_cache_versionado()
+def carregar_linhas_abas(_client, spreadsheet_id) -> Dict[str, int]:
+    """{aba: linhas da grade (gridProperties.rowCount)}, na ordem da planilha, numa chamada de metadados"""
+    try:
+        return {ws.title: ws.row_count for ws in abrir_planilha_selecionada(_client, spreadsheet_id).worksheets()}
+    except Exception:
+        return {}
+
+@_cache_versionado()
 def listar_abas_estacoes(_client, spreadsheet_id):
     try:
-        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        todas = [ws.title for ws in planilha.worksheets()]
-        estacoes = [t for t in todas if t not in ABAS_SISTEMA]
+        abas_sistema = carregar_layout_evento(_client, spreadsheet_id)["abas_sistema"]
+        todas = list(carregar_linhas_abas(_client, spreadsheet_id))
+        estacoes = [t for t in todas if t not in abas_sistema]
         return estacoes
     except:
         return []
@@ -147,7 +599,10 @@ def render_header(imagem_esq: str = "anatel.png", imagem_dir: str = "anatelS.png
     if evento_atual:
         if show_logout:
             if st.button(f"Evento selecionado: {evento_atual} 🔄", key="btn_trocar_evento_texto", help="Clique para trocar de evento"):
-                for key in ['evento_nome', 'spreadsheet_id', 'view']:
+                # Resultados da sessão presos ao evento (busca, exportação...) saem junto
+                for key in ['evento_nome', 'spreadsheet_id', 'view', 'busca_res', 'busca_pagina', 'export_arquivos',
+                            'export_linhas', 'lista_conflitos', 'consulta_aberta',
+                            'importacao_previa', 'importacao_medidas', 'importacao_ok']:
                     if key in st.session_state:
                         del st.session_state[key]
                 st.rerun()
@@ -417,73 +872,66 @@ st.markdown(f"""
 
 # ===================== HELPERS =====================
 
-def verificar_frequencia_existente(client, spreadsheet_id, freq_digitada):
-    """Verifica se a frequência existe nas abas de Abordagem, UTE ou Estações"""
-    if not freq_digitada or freq_digitada <= 0:
-        return None
-    
+ARQUIVO_GRADE_FUSOS = Path("fusos_brasil.bin")   # gerado por gerar_grade_fusos.py
+_MAGICO_GRADE = b"FUSOBR1\0"
+
+@st.cache_resource(show_spinner=False)
+def _grade_fusos():
+    """Grade de 0,1° com o fuso IANA de cada célula do Brasil (1 byte/célula, 0 = consultar o TimezoneFinder)"""
+    inicio = time.perf_counter()
     try:
-        f_val = round(float(freq_digitada), 3)
-        planilha = abrir_planilha_selecionada(client, spreadsheet_id)
-        
-        # 1. Verificar na Abordagem (Coluna M)
-        aba_abord = planilha.worksheet("Abordagem")
-        # Buscamos os valores da coluna M (índice 13)
-        col_m = aba_abord.col_values(13) 
-        for val in col_m[1:]: # Pula cabeçalho
-            try:
-                if round(float(str(val).replace(",", ".")), 3) == f_val:
-                    return "Abordagem"
-            except: continue
-
-        # 2. Verificar na Tabela UTE (Coluna E)
-        aba_ute = planilha.worksheet("Tabela UTE")
-        col_e = aba_ute.col_values(5)
-        for val in col_e[1:]:
-            try:
-                if round(float(str(val).replace(",", ".")), 3) == f_val:
-                    return "Tabela UTE"
-            except: continue
-
-        # 3. Verificar nas abas de Estações (Coluna F)
-        estacoes = listar_abas_estacoes(client, spreadsheet_id)
-        for nome_est in estacoes:
-            aba_est = planilha.worksheet(nome_est)
-            col_f = aba_est.col_values(6) # Geralmente freq está na F nas remotas
-            for val in col_f[1:]:
-                try:
-                    if round(float(str(val).replace(",", ".")), 3) == f_val:
-                        return f"Estação {nome_est}"
-                except: continue
-                
+        bruto = ARQUIVO_GRADE_FUSOS.read_bytes()
+        if not bruto.startswith(_MAGICO_GRADE):
+            return None
+        pos = len(_MAGICO_GRADE) + 4
+        (tam,) = struct.unpack("<I", bruto[len(_MAGICO_GRADE):pos])
+        cab = json.loads(bruto[pos:pos + tam])
+        celulas = zlib.decompress(bruto[pos + tam:])
+        if len(celulas) != cab["linhas"] * cab["colunas"]:
+            return None
     except Exception:
-        pass
+        return None
+    _registrar_custo("grade de fusos", inicio)
+    return cab, celulas
+
+def _fuso_pela_grade(lat: float, lon: float) -> Optional[str]:
+    """Fuso pela grade pré-calculada; None fora da cobertura ou em célula de fronteira"""
+    grade = _grade_fusos()
+    if grade is None:
+        return None
+    cab, celulas = grade
+    i = math.floor((lat - cab["lat_min"]) / cab["passo"])
+    j = math.floor((lon - cab["lon_min"]) / cab["passo"])
+    if 0 <= i < cab["linhas"] and 0 <= j < cab["colunas"]:
+        codigo = celulas[i * cab["colunas"] + j]
+        if codigo:
+            return cab["fusos"][codigo - 1]
     return None
 
+@st.cache_resource(show_spinner=False)
+def _localizador_fuso():
+    """TimezoneFinder (carrega os polígonos) uma vez por processo; só usado fora da grade de fusos"""
+    inicio = time.perf_counter()
+    from timezonefinder import TimezoneFinder
+    tf = TimezoneFinder()
+    _registrar_custo("TimezoneFinder", inicio)
+    return tf
+
 @st.cache_data(ttl=3600, show_spinner=False)
 def obter_fuso_horario_evento(_client, spreadsheet_id):
     """Busca lat/long e converte para o fuso horário local. Falha para Brasília."""
     fuso_padrao = "America/Sao_Paulo"
     try:
-        from timezonefinder import TimezoneFinder
+        # Lat/Long nas células do layout (padrão AE3/AE4)
+        lat_str, lon_str = _coordenadas_evento(_client, spreadsheet_id)
         
-        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        abas_estacoes = [ws for ws in planilha.worksheets() if ws.title not in ABAS_SISTEMA]
-        
-        if abas_estacoes:
-            aba = abas_estacoes[0]
-            # Busca Lat em AE3 e Long em AE4
-            lat_str = aba.cell(3, 31).value
-            lon_str = aba.cell(4, 31).value
+        if lat_str and lon_str:
+            lat = float(str(lat_str).replace(',', '.').strip())
+            lon = float(str(lon_str).replace(',', '.').strip())
             
-            if lat_str and lon_str:
-                lat = float(str(lat_str).replace(',', '.').strip())
-                lon = float(str(lon_str).replace(',', '.').strip())
-                
-                tf = TimezoneFinder()
-                fuso_encontrado = tf.timezone_at(lng=lon, lat=lat)
-                if fuso_encontrado:
-                    return fuso_encontrado
+            fuso_encontrado = _fuso_pela_grade(lat, lon) or _localizador_fuso().timezone_at(lng=lon, lat=lat)
+            if fuso_encontrado:
+                return fuso_encontrado
     except Exception as e:
         # Se houver qualquer erro (falta de coord, texto no lugar de número), ignora e usa o padrão
         pass
@@ -505,16 +953,106 @@ def _col_to_index(letter: str) -> int:
         res = res * 26 + (ord(ch) - ord('A') + 1)
     return res
 
-def _first_empty_row_in_block(aba, start_col_letter: str, end_col_letter: str) -> int:
-    start_idx = _col_to_index(start_col_letter)
-    end_idx   = _col_to_index(end_col_letter)
-    max_len = 1
-    for idx in range(start_idx, end_idx + 1):
-        try:
-            vals = aba.col_values(idx)
-            if len(vals) > max_len: max_len = len(vals)
-        except: pass
-    return max_len + 1
+def _intervalo(aba_nome: str, a1: str) -> str:
+    """Monta o intervalo A1 qualificado pela aba ('Nome da Aba'!A1:B2) para chamadas em lote"""
+    return "'{}'!{}".format(aba_nome.replace("'", "''"), a1)
+
+def _col_letter(idx: int) -> str:
+    """Inverso de _col_to_index (1 -> A, 27 -> AA)"""
+    letras = ""
+    while idx > 0:
+        idx, resto = divmod(idx - 1, 26)
+        letras = chr(ord('A') + resto) + letras
+    return letras
+
+def _pad(row: List[str], n: int) -> List[str]:
+    """Completa/corta a linha devolvida pela API (que omite células vazias no final)"""
+    row = list(row[:n])
+    return row + [""] * (n - len(row))
+
+# Limite de intervalos por chamada batchGet (os intervalos vão na URL)
+LOTE_INTERVALOS = 100
+
+def _linhas_pendentes(valores_coluna: List[List[str]], primeira_linha: int) -> List[int]:
+    """Números de linha (na planilha) cuja coluna Situação está como 'Pendente'"""
+    return [primeira_linha + i for i, r in enumerate(valores_coluna)
+            if r and str(r[0]).strip().lower() == "pendente"]
+
+def _faixas_contiguas(linhas: List[int], folga: int = 2) -> List[tuple]:
+    """Agrupa números de linha em faixas (ini, fim); buracos pequenos são absorvidos para gerar menos intervalos"""
+    faixas = []
+    for n in sorted(set(linhas)):
+        if faixas and n - faixas[-1][1] <= folga + 1:
+            faixas[-1][1] = n
+        else:
+            faixas.append([n, n])
+    return [tuple(f) for f in faixas]
+
+def _ler_linhas(planilha, pedidos: Dict[str, tuple]) -> Dict[str, List[tuple]]:
+    """
+    Lê apenas as linhas pedidas de várias abas em poucas chamadas batchGet.
+    pedidos: {aba: (linhas, col_ini, col_fim)} -> {aba: [(linha, valores), ...]}
+    """
+    intervalos, donos = [], []
+    for aba, (linhas, c_ini, c_fim) in pedidos.items():
+        for ini, fim in _faixas_contiguas(linhas):
+            intervalos.append(_intervalo(aba, f"{c_ini}{ini}:{c_fim}{fim}"))
+            donos.append((aba, ini, fim))
+
+    alvo = {aba: set(linhas) for aba, (linhas, _, _) in pedidos.items()}
+    resultado = {aba: [] for aba in pedidos}
+    for k in range(0, len(intervalos), LOTE_INTERVALOS):
+        resp = planilha.values_batch_get(intervalos[k:k + LOTE_INTERVALOS])
+        for (aba, ini, fim), vr in zip(donos[k:k + LOTE_INTERVALOS], resp.get("valueRanges", [])):
+            vals = vr.get("values", [])
+            for off in range(fim - ini + 1):
+                if ini + off in alvo[aba]:
+                    resultado[aba].append((ini + off, vals[off] if off < len(vals) else []))
+    return resultado
+
+LINHAS_POR_JANELA = 2000
+
+def _janelas_de_linhas(planilha, pedidos: Dict[str, tuple], linhas_abas: Dict[str, int], tamanho: int = LINHAS_POR_JANELA):
+    """
+    Gerador que lê abas grandes em janelas de `tamanho` linhas: cada rodada é uma batchGet com a próxima
+    janela de todos os pedidos ainda abertos, e quem consome projeta/filtra a janela antes da seguinte chegar.
+    pedidos: {chave: (aba, primeira_linha, col_ini, col_fim)} -> produz (chave, linha_da_janela, valores)
+    linhas_abas: {aba: linhas da grade} (carregar_linhas_abas); as janelas vão até o fim da grade, sem depender
+    do tamanho da resposta (a API corta linhas vazias, então janela curta ou vazia não quer dizer fim da aba).
+    """
+    proxima = {chave: p[1] for chave, p in pedidos.items()}
+    fim = {chave: linhas_abas.get(p[0]) for chave, p in pedidos.items()}
+    while proxima:
+        abertas = list(proxima)
+        for k in range(0, len(abertas), LOTE_INTERVALOS):
+            lote = abertas[k:k + LOTE_INTERVALOS]
+            intervalos = []
+            for chave in lote:
+                aba, _, c_ini, c_fim = pedidos[chave]
+                intervalos.append(_intervalo(aba, f"{c_ini}{proxima[chave]}:{c_fim}{proxima[chave] + tamanho - 1}"))
+            resp = planilha.values_batch_get(intervalos).get("valueRanges", [])
+            for chave, vr in zip(lote, resp):
+                vals, linha = vr.get("values", []), proxima[chave]
+                proxima[chave] += tamanho
+                # Sem o tamanho da grade (metadados indisponíveis), a primeira janela vazia encerra a aba
+                if (fim[chave] is None and not vals) or (fim[chave] is not None and proxima[chave] > fim[chave]):
+                    del proxima[chave]
+                if vals: yield chave, linha, vals
+
+def _detectar_linha_cabecalho(topo: List[List[str]]) -> int:
+    """Procura, nas primeiras linhas, a que tenha "Situação" E ("ID" ou "Data"); devolve o índice (0 se não achar)"""
+    for i in range(min(6, len(topo))):
+        row_txt = [str(c).lower().strip() for c in topo[i]]
+        if any("situa" in x for x in row_txt) and (any("id" == x for x in row_txt) or any("data" in x for x in row_txt)):
+            return i
+    return 0
+
+def _first_empty_row_in_block(planilha, aba_nome: str, start_col_letter: str, end_col_letter: str) -> int:
+    # Uma única leitura do bloco inteiro: a API já corta as linhas vazias do final
+    try:
+        vals = planilha.values_get(_intervalo(aba_nome, f"{start_col_letter}1:{end_col_letter}")).get("values", [])
+    except: vals = []
+    return max(len(vals), 1) + 1
 
 def _first_row_where_col_empty(aba, col_letter: str, start_row: int = 2) -> int:
     col_idx = _col_to_index(col_letter)
@@ -525,17 +1063,11 @@ def _first_row_where_col_empty(aba, col_letter: str, start_row: int = 2) -> int:
         if (col_vals[i] or "").strip() == "": return i + 1
     return len(col_vals) + 1
 
-def _next_sequential_id(aba, col_letter: str = "H", start_row: int = 2) -> str:
-    col_idx = _col_to_index(col_letter)
-    try: 
-        col_vals = aba.col_values(col_idx)
-    except: 
-        col_vals = []
-    
+def _maior_numero_abo(valores: List[str]) -> int:
+    """Maior N entre os IDs no formato Abo-N (0 se não houver nenhum)"""
     max_num = 0
     # Percorre os valores existentes para encontrar o maior número após "Abo-"
-    for i, v in enumerate(col_vals, start=1):
-        if i < start_row: continue
+    for v in valores:
         s = (v or "").strip()
         if not s: continue
         
@@ -546,11 +1078,67 @@ def _next_sequential_id(aba, col_letter: str = "H", start_row: int = 2) -> str:
                 n = int(match.group(1))
                 if n > max_num: max_num = n
             except: pass
-            
-    proximo = max_num + 1
+    return max_num
+
+def _next_sequential_id(aba, col_letter: str = "H", start_row: int = 2) -> str:
+    col_idx = _col_to_index(col_letter)
+    try: 
+        col_vals = aba.col_values(col_idx)
+    except: 
+        col_vals = []
+    
+    proximo = _maior_numero_abo(col_vals[start_row - 1:]) + 1
     # Retorna no formato Abo-XX (com zero à esquerda se for menor que 10)
     return f"Abo-{proximo:02d}"
 
+def _para_numero(serie: pd.Series) -> pd.Series:
+    """Converte texto da planilha ("450,125") em float; valores inválidos viram NaN"""
+    return pd.to_numeric(serie.astype(str).str.strip().str.replace(",", ".", regex=False), errors="coerce")
+
+def _para_momento(texto: pd.Series) -> pd.Series:
+    """
+    Texto de data/hora -> datetime. ISO 8601 (aaaa-mm-dd...) primeiro; só o que não casar é lido com o dia
+    na frente (dd/mm/aaaa...). Com dayfirst direto, "2024-05-01" viraria 5 de janeiro.
+    """
+    datas = pd.to_datetime(texto, format="ISO8601", errors="coerce")
+    if datas.dt.tz is not None: datas = datas.dt.tz_convert(None)
+    faltando = datas.isna() & texto.notna() & texto.ne("")
+    if faltando.any():
+        datas[faltando] = pd.to_datetime(texto[faltando], dayfirst=True, errors="coerce", format="mixed")
+    return datas
+
+def _para_data(serie: pd.Series) -> pd.Series:
+    """Converte datas da planilha (dd/mm/aaaa, com fallback para outros formatos) em datetime"""
+    texto = serie.astype(str).str.strip()
+    datas = pd.to_datetime(texto, format="%d/%m/%Y", errors="coerce")
+    faltando = datas.isna() & texto.ne("")
+    if faltando.any():
+        datas[faltando] = _para_momento(texto[faltando])
+    return datas
+
+def _fmt_num(valor) -> str:
+    """Formata número da base compacta para exibição (sem zeros à direita; NaN vira vazio)"""
+    try:
+        if pd.isna(valor): return ""
+        return ("%.6f" % float(valor)).rstrip("0").rstrip(".")
+    except (TypeError, ValueError):
+        return str(valor)
+
+# Colunas de poucos valores distintos viram 'category'; frequência e largura viram float
+COLS_CATEGORICAS = ["Local", "EstacaoRaw", "Fiscal", "Situação", "Identificação", "Faixa de Frequência Envolvida",
+                    "Autorizado?", "UTE?", "Interferente?", "Fonte", "Aba/Origem"]
+COLS_NUMERICAS = ["Frequência (MHz)", "Largura (kHz)"]
+
+def _compactar_pendencias(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduz a memória do DataFrame de pendências (categóricas + numéricas)"""
+    if df.empty: return df
+    df = df.copy()
+    for col in COLS_NUMERICAS:
+        if col in df.columns: df[col] = _para_numero(df[col])
+    for col in COLS_CATEGORICAS:
+        if col in df.columns: df[col] = df[col].astype(object).fillna("").astype(str).astype("category")
+    return df
+
 def _valid_neg_coord(value: str) -> bool:
     if value is None: return True
     v = value.strip()
@@ -559,389 +1147,687 @@ def _valid_neg_coord(value: str) -> bool:
 
 # ===================== FUNÇÕES DE CARGA =====================
 
-def verificar_frequencia_global(client, spreadsheet_id, freq_digitada):
-    if freq_digitada <= 0:
-        return None
-    try:
-        f_val = round(float(freq_digitada), 3)
-        planilha = abrir_planilha_selecionada(client, spreadsheet_id)
-        
-        # 1. Verifica na Abordagem (Coluna M - índice 13)
-        aba_abord = planilha.worksheet("Abordagem")
-        col_m = aba_abord.col_values(13)
-        for val in col_m[1:]:
-            try:
-                if round(float(str(val).replace(",", ".")), 3) == f_val: 
-                    return "Abordagem"
-            except: continue
-
-        # 2. Verifica na Tabela UTE (Frequência na Coluna E - índice 5)
-        aba_ute = planilha.worksheet("Tabela UTE")
-        # Pegamos colunas A (Entidade) e E (Frequência) para evitar múltiplas chamadas
-        entidades = aba_ute.col_values(1)
-        freqs_ute = aba_ute.col_values(5)
-        
-        for i in range(1, len(freqs_ute)):
-            try:
-                if round(float(str(freqs_ute[i]).replace(",", ".")), 3) == f_val: 
-                    entidade = entidades[i] if i < len(entidades) else "Não identificada"
-                    return f"UTE [Entidade: {entidade}]" # Retorno formatado conforme solicitado
-            except: continue
-
-        # 3. Verifica em todas as abas de Estações (Coluna F)
-        estacoes = listar_abas_estacoes(client, spreadsheet_id)
-        for nome_est in estacoes:
-            aba_est = planilha.worksheet(nome_est)
-            col_f = aba_est.col_values(6)
-            for val in col_f[1:]:
-                try:
-                    if round(float(str(val).replace(",", ".")), 3) == f_val: 
-                        return f"Estação {nome_est}"
-                except: continue
-    except: pass
-    return None
-
-@st.cache_data(ttl=150, show_spinner=False)
+def _matriz_para_df(valores: List[List[str]], n_cols: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Matriz crua da API (linhas de tamanhos variados) -> DataFrame de largura fixa, células faltantes como vazio"""
+    df = pd.DataFrame(valores).reindex(columns=range(n_cols)).fillna("")
+    if columns is not None: df.columns = columns
+    return df
+
+def _projetar_ute(matriz: List[List[str]], layout: Dict = LAYOUT_PADRAO) -> pd.DataFrame:
+    """Tabela UTE (sem o cabeçalho) -> colunas do app; descarta linhas sem Processo SEI"""
+    if not matriz: return pd.DataFrame()
+    idx = {k: _col_to_index(layout[k]) - 1 for k in ("ute_col_entidade", "ute_col_local", "ute_col_freq", "ute_col_sei")}
+    n_cols = max(idx.values()) + 1
+    cru = _matriz_para_df(matriz, n_cols)
+    cru = cru[[len(r) > idx["ute_col_sei"] for r in matriz]]
+    df = pd.DataFrame({
+        "País/Entidade": cru[idx["ute_col_entidade"]], 
+        "Local": cru[idx["ute_col_local"]],            # Padrão: Coluna D
+        "Frequência (MHz)": cru[idx["ute_col_freq"]],  # Padrão: Coluna E
+        "Processo SEI": cru[idx["ute_col_sei"]]        # Padrão: Coluna H
+    })
+    return df[df["Processo SEI"].astype(str).str.strip() != ""].reset_index(drop=True)
+
+@_cache_versionado(tipo="ute")
 def carregar_dados_ute(_client, spreadsheet_id):
     try:
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
         aba = planilha.worksheet("Tabela UTE")
         matriz = aba.get_all_values()
         if not matriz or len(matriz) < 2: return pd.DataFrame()
-        dados = []
-        for row in matriz[1:]:
-            if len(row) > 7:
-                dados.append({
-                    "País/Entidade": row[0], 
-                    "Local": row[3],            # Puxa da Coluna D
-                    "Frequência (MHz)": row[4], # Puxa da Coluna E
-                    "Processo SEI": row[7]      # Puxa da Coluna H
-                })
-        df = pd.DataFrame(dados)
-        df = df[df["Processo SEI"].str.strip() != ""]
-        return df
+        return _projetar_ute(matriz[1:], carregar_layout_evento(_client, spreadsheet_id))
     except Exception as e:
         return pd.DataFrame()
 
-@st.cache_data(ttl=150, show_spinner=False)
-def carregar_pendencias_painel_mapeadas(_client, spreadsheet_id):
+# Bloco de dados real da Abordagem (H:W), na ordem das colunas
+COLS_ABORDAGEM_HW = [
+    "ID", "Local", "Fiscal", "Data", "HH:mm", "Frequência (MHz)", "Largura (kHz)",
+    "Faixa de Frequência Envolvida", "Identificação", "Autorizado?", "UTE?", "Processo SEI UTE",
+    "Ocorrência (observações)", "Alguém mais ciente?", "Interferente?", "Situação",
+]
+
+# Detecção de colunas nas abas de estação (cabeçalhos variam de estação para estação)
+MAPA_COLS_ESTACAO = {
+    'est': lambda s: "estação" in s or "estacao" in s or "local" in s,
+    'situ': lambda s: "situação" in s or "situacao" in s,
+    'id': lambda s: s == "id",
+    'fiscal': lambda s: "fiscal" in s,
+    
+    # AQUI FICOU MAIS LIMPO: Busca apenas "data" ou "dia"
+    'data': lambda s: "data" in s or "dia" in s,
+    
+    'hora': lambda s: "hh" in s or "hora" in s,
+    'freq': lambda s: "frequência" in s or "frequencia" in s,
+    'bw': lambda s: "largura" in s,
+    'faixa': lambda s: "faixa" in s,
+    'ident': lambda s: "identificação" in s,
+    'autz': lambda s: "autorizado" in s,
+    'ute': lambda s: "ute" in s,
+    'proc': lambda s: "processo" in s,
+    'obs': lambda s: "ocorrência" in s or "observa" in s,
+    'cient': lambda s: "ciente" in s,
+    'inter': lambda s: "interferente" in s
+}
+
+# Detecção de colunas no PAINEL (nomes mais estritos que nas estações)
+MAPA_COLS_PAINEL = {
+    'situ': lambda s: s == "situação" or s == "situacao",
+    'est': lambda s: "estação" in s or "estacao" in s,
+    'id': lambda s: s == "id",
+    'fiscal': lambda s: "fiscal" in s,
+    'data': lambda s: s == "data" or s == "dia",
+    'hora': lambda s: "hh" in s or "hora" in s,
+    'freq': lambda s: "frequência" in s or "frequencia" in s,
+    'bw': lambda s: "largura" in s,
+    'faixa': lambda s: "faixa" in s and "envolvida" in s,
+    'ident': lambda s: "identificação" in s,
+    'autz': lambda s: "autorizado" in s,
+    'ute': lambda s: s.strip() == "ute" or "ute?" in s,
+    'proc': lambda s: "processo" in s and "sei" in s,
+    'obs': lambda s: "ocorrência" in s or "observa" in s,
+    'cient': lambda s: "ciente" in s,
+    'inter': lambda s: "interferente" in s
+}
+
+def _mapear_colunas(header: List[str], mapa: Dict) -> Dict[str, Optional[str]]:
+    return {k: _first_col_match(header, v) for k, v in mapa.items()}
+
+def _mapear_colunas_estacao(header: List[str]) -> Dict[str, Optional[str]]:
+    return _mapear_colunas(header, MAPA_COLS_ESTACAO)
+
+def _projetar_painel(df: pd.DataFrame, found: Dict[str, Optional[str]]) -> pd.DataFrame:
+    """Converte as colunas cruas do PAINEL para os nomes padronizados do app"""
+    out = pd.DataFrame(index=df.index)
+    out["Local"] = df[found['est']]
+    out["EstacaoRaw"] = df[found['est']]
+    out["ID"] = df[found['id']]
+    
+    mappings = [
+        ("Fiscal", 'fiscal'), ("Data", 'data'), ("HH:mm", 'hora'),
+        ("Frequência (MHz)", 'freq'), ("Largura (kHz)", 'bw'),
+        ("Faixa de Frequência Envolvida", 'faixa'), ("Identificação", 'ident'),
+        ("Autorizado?", 'autz'), ("UTE?", 'ute'), ("Processo SEI UTE", 'proc'),
+        ("Ocorrência (observações)", 'obs'), ("Alguém mais ciente?", 'cient'),
+        ("Interferente?", 'inter'), ("Situação", 'situ')
+    ]
+    for dest, key in mappings:
+        out[dest] = df[found[key]] if found[key] else ""
+    return out
+
+def _projetar_estacao(df: pd.DataFrame, found: Dict[str, Optional[str]], nome_aba: str) -> pd.DataFrame:
+    """Converte as colunas cruas de uma aba de estação para os nomes padronizados do app"""
+    out = pd.DataFrame(index=df.index)
+    
+    # Preenchimento inteligente dos campos principais
+    out["ID"] = df[found['id']] if found['id'] else (df.iloc[:, 0] if len(df.columns)>0 else "")
+    
+    if found['est']: out["Local"] = df[found['est']]
+    elif len(df.columns) > 1: out["Local"] = df.iloc[:, 1]
+    else: out["Local"] = nome_aba
+    
+    out["EstacaoRaw"] = nome_aba
+
+    # Data agora deve ser encontrada facilmente
+    if found['data']:
+        out["Data"] = df[found['data']]
+    else:
+        # Fallback de segurança ainda útil
+        if len(df.columns) > 3: out["Data"] = df.iloc[:, 3] 
+        elif len(df.columns) > 1: out["Data"] = df.iloc[:, 1]
+        else: out["Data"] = ""
+
+    mappings = [
+        ("Fiscal", 'fiscal'), ("HH:mm", 'hora'),
+        ("Frequência (MHz)", 'freq'), ("Largura (kHz)", 'bw'),
+        ("Faixa de Frequência Envolvida", 'faixa'), ("Identificação", 'ident'),
+        ("Autorizado?", 'autz'), ("UTE?", 'ute'), ("Processo SEI UTE", 'proc'),
+        ("Ocorrência (observações)", 'obs'), ("Alguém mais ciente?", 'cient'),
+        ("Interferente?", 'inter'), ("Situação", 'situ')
+    ]
+    
+    for dest, key in mappings:
+        out[dest] = df[found[key]] if found[key] else ""
+    return out
+
+@_cache_versionado(ttl=3600)
+def carregar_cabecalhos_abas(_client, spreadsheet_id) -> Dict[str, tuple]:
+    """
+    Cabeçalho do PAINEL e de cada estação: {aba: (linha_do_cabecalho, [colunas])}.
+    Uma única leitura em lote das primeiras linhas; muda raramente, por isso o TTL longo.
+    """
     try:
+        estacoes = listar_abas_estacoes(_client, spreadsheet_id)
+        linha_fixa = carregar_layout_evento(_client, spreadsheet_id)["estacao_linha_cabecalho"]
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        aba = planilha.worksheet("PAINEL")
-        matriz = aba.get("A1:AF")
-        if not matriz or len(matriz) < 2: return pd.DataFrame()
+        abas = ["PAINEL"] + estacoes
+        resp = planilha.values_batch_get([_intervalo("PAINEL", "A1:AF1")] + [_intervalo(a, "1:6") for a in estacoes])
+
+        cabecalhos = {}
+        for aba, vr in zip(abas, resp.get("valueRanges", [])):
+            topo = vr.get("values", [])
+            if not topo: continue
+            # A CONFIG pode fixar a linha do cabeçalho das estações quando a detecção não serve
+            if aba != "PAINEL" and linha_fixa.isdigit() and int(linha_fixa) <= len(topo):
+                idx = int(linha_fixa) - 1
+            else:
+                idx = _detectar_linha_cabecalho(topo)
+            cabecalhos[aba] = (idx + 1, [str(c) for c in topo[idx]])
+        return cabecalhos
+    except Exception:
+        return {}
 
-        header, rows = matriz[0], matriz[1:]
-        df = pd.DataFrame(rows, columns=header)
-        
-        def col_like(*checks):
-            return _first_col_match(df.columns, *[(lambda s, c=c: c(s)) for c in checks])
-
-        cols_map = {
-            'situ': lambda s: s == "situação" or s == "situacao",
-            'est': lambda s: "estação" in s or "estacao" in s,
-            'id': lambda s: s == "id",
-            'fiscal': lambda s: "fiscal" in s,
-            'data': lambda s: s == "data" or s == "dia",
-            'hora': lambda s: "hh" in s or "hora" in s,
-            'freq': lambda s: "frequência" in s or "frequencia" in s,
-            'bw': lambda s: "largura" in s,
-            'faixa': lambda s: "faixa" in s and "envolvida" in s,
-            'ident': lambda s: "identificação" in s,
-            'autz': lambda s: "autorizado" in s,
-            'ute': lambda s: s.strip() == "ute" or "ute?" in s,
-            'proc': lambda s: "processo" in s and "sei" in s,
-            'obs': lambda s: "ocorrência" in s or "observa" in s,
-            'cient': lambda s: "ciente" in s,
-            'inter': lambda s: "interferente" in s
-        }
+@_cache_versionado(tipo="estacoes")
+def carregar_pendencias_painel_mapeadas(_client, spreadsheet_id):
+    try:
+        cab = carregar_cabecalhos_abas(_client, spreadsheet_id).get("PAINEL")
+        if not cab: return pd.DataFrame()
+        linha_cab, header = cab
         
-        found_cols = {k: col_like(v) for k, v in cols_map.items()}
+        found_cols = _mapear_colunas(header, MAPA_COLS_PAINEL)
         
         if not (found_cols['situ'] and found_cols['est'] and found_cols['id']): return pd.DataFrame()
 
+        # 1. Só a coluna Situação; 2. só as linhas pendentes (o histórico concluído não trafega)
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        col_situ = _col_letter(header.index(found_cols['situ']) + 1)
+        situacoes = planilha.values_get(_intervalo("PAINEL", f"{col_situ}{linha_cab + 1}:{col_situ}")).get("values", [])
+        linhas = _linhas_pendentes(situacoes, linha_cab + 1)
+        if not linhas: return pd.DataFrame()
+
+        lidas = _ler_linhas(planilha, {"PAINEL": (linhas, "A", _col_letter(len(header)))})["PAINEL"]
+        df = pd.DataFrame([_pad(v, len(header)) for _, v in lidas], columns=header)
+        df["_linha"] = [linha for linha, _ in lidas]
+
         situ = df[found_cols['situ']].astype(str).str.strip().str.lower()
         pend = df[situ.eq("pendente")].copy()
         if pend.empty: return pd.DataFrame()
 
-        out = pd.DataFrame()
-        out["Local"] = pend[found_cols['est']]
-        out["EstacaoRaw"] = pend[found_cols['est']]
-        out["ID"] = pend[found_cols['id']]
-        
-        mappings = [
-            ("Fiscal", 'fiscal'), ("Data", 'data'), ("HH:mm", 'hora'),
-            ("Frequência (MHz)", 'freq'), ("Largura (kHz)", 'bw'),
-            ("Faixa de Frequência Envolvida", 'faixa'), ("Identificação", 'ident'),
-            ("Autorizado?", 'autz'), ("UTE?", 'ute'), ("Processo SEI UTE", 'proc'),
-            ("Ocorrência (observações)", 'obs'), ("Alguém mais ciente?", 'cient'),
-            ("Interferente?", 'inter'), ("Situação", 'situ')
-        ]
-        for dest, key in mappings:
-            out[dest] = pend[found_cols[key]] if found_cols[key] else ""
-
+        out = _projetar_painel(pend, found_cols)
+        out["_linha"] = pend["_linha"]
         out = out.sort_values(by=["Local", "Data"], kind="stable", na_position="last").reset_index(drop=True)
         out["Fonte"] = "PAINEL"
-        return out
+        return _compactar_pendencias(out)
     except Exception as e:
         return pd.DataFrame()
 
-@st.cache_data(ttl=150, show_spinner=False)
+@_cache_versionado(tipo="estacoes")
 def carregar_pendencias_abordagem_pendentes(_client, spreadsheet_id):
     try:
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        aba = planilha.worksheet("Abordagem")
-        # Busca o bloco de dados real da Abordagem (H:W)
-        matriz = aba.get("H1:W")
-        if not matriz or len(matriz) < 2: return pd.DataFrame()
-
-        header, rows = matriz[0], matriz[1:]
-        
-        def get_col(idx_offset): 
-            return pd.Series([str(r[idx_offset]).strip() if len(r)>idx_offset else "" for r in rows])
-
-        pend = pd.DataFrame({
-            "ID": get_col(0),    # Coluna H
-            "Local": get_col(1), # Coluna I (Estação)
-            "Fiscal": get_col(2),# Coluna J
-            "Data": get_col(3),  # Coluna K
-            "HH:mm": get_col(4), # Coluna L
-            "Frequência (MHz)": get_col(5), # Coluna M
-            "Largura (kHz)": get_col(6),    # Coluna N
-            "Faixa de Frequência Envolvida": get_col(7), # Coluna O
-            "Identificação": get_col(8),    # Coluna P
-            "Autorizado?": get_col(9),      # Coluna Q
-            "UTE?": get_col(10),            # Coluna R
-            "Processo SEI UTE": get_col(11),# Coluna S
-            "Ocorrência (observações)": get_col(12), # Coluna T
-            "Alguém mais ciente?": get_col(13), # Coluna U
-            "Interferente?": get_col(14),   # Coluna V
-            "Situação": get_col(15),         # Coluna W
-            "EstacaoRaw": "ABORDAGEM",
-            "Fonte": "ABORDAGEM",
-        })
+        ini, fim = _bloco(carregar_layout_evento(_client, spreadsheet_id)["abordagem_dados"])
+        # 1. Só a coluna Situação (última do bloco de dados real da Abordagem, padrão H:W)
+        situacoes = planilha.values_get(_intervalo("Abordagem", f"{fim}2:{fim}")).get("values", [])
+        linhas = _linhas_pendentes(situacoes, 2)
+        if not linhas: return pd.DataFrame()
+
+        # 2. Só as linhas pendentes do bloco
+        lidas = _ler_linhas(planilha, {"Abordagem": (linhas, ini, fim)})["Abordagem"]
+        rows = [_pad(v, len(COLS_ABORDAGEM_HW)) for _, v in lidas]
+        pend = pd.DataFrame(rows, columns=COLS_ABORDAGEM_HW).apply(lambda col: col.astype(str).str.strip())
+        pend["_linha"] = [linha for linha, _ in lidas]
+        pend["EstacaoRaw"] = "ABORDAGEM"
+        pend["Fonte"] = "ABORDAGEM"
 
         # Filtra apenas o que for 'Pendente' (ignora maiúsculas/minúsculas)
         pend = pend[pend["Situação"].str.lower().str.strip() == "pendente"].copy()
-        return pend.sort_values(by=["Local","Data"], kind="stable").reset_index(drop=True)
+        return _compactar_pendencias(pend.sort_values(by=["Local","Data"], kind="stable").reset_index(drop=True))
     except Exception:
         return pd.DataFrame()
 
-@st.cache_data(ttl=150, show_spinner=False)
+@_cache_versionado(tipo="estacoes")
 def carregar_pendencias_todas_estacoes(_client, spreadsheet_id):
     """
     Busca pendências em TODAS as abas de estações.
-    Versão OTIMIZADA para coluna padronizada 'Data'.
+    Lê só a coluna Situação de cada aba e depois só as linhas pendentes, sempre em lote.
     """
     try:
-        estacoes = listar_abas_estacoes(_client, spreadsheet_id)
+        cabecalhos = carregar_cabecalhos_abas(_client, spreadsheet_id)
+        estacoes = [e for e in listar_abas_estacoes(_client, spreadsheet_id) if e in cabecalhos]
         if not estacoes: return pd.DataFrame()
 
+        # 1. MAPEIA AS COLUNAS PELO CABEÇALHO (JÁ EM CACHE)
+        found_por_aba = {}
+        for nome_aba in estacoes:
+            _, header = cabecalhos[nome_aba]
+            found = _mapear_colunas_estacao(header)
+            if found['situ']: found_por_aba[nome_aba] = found
+        if not found_por_aba: return pd.DataFrame()
+
+        # 2. COLUNA SITUAÇÃO DE TODAS AS ABAS, EM JANELAS (UMA CHAMADA POR RODADA); GUARDA SÓ OS Nº DAS PENDENTES
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        colunas = {}
+        for nome_aba, found in found_por_aba.items():
+            linha_cab, header = cabecalhos[nome_aba]
+            letra = _col_letter(header.index(found['situ']) + 1)
+            colunas[nome_aba] = (nome_aba, linha_cab + 1, letra, letra)
+
+        pendentes = {}
+        for nome_aba, linha, vals in _janelas_de_linhas(planilha, colunas, carregar_linhas_abas(_client, spreadsheet_id)):
+            pendentes.setdefault(nome_aba, []).extend(_linhas_pendentes(vals, linha))
+
+        pedidos = {aba: (linhas, "A", _col_letter(len(cabecalhos[aba][1]))) for aba, linhas in pendentes.items() if linhas}
+        if not pedidos: return pd.DataFrame()
+
+        # 3. SÓ AS LINHAS PENDENTES DE TODAS AS ABAS
+        lidas = _ler_linhas(planilha, pedidos)
         dfs = []
 
-        for nome_aba in estacoes:
+        for nome_aba in pedidos:
             try:
-                aba = planilha.worksheet(nome_aba)
-                matriz = aba.get_all_values()
-                if not matriz or len(matriz) < 2: continue
-
-                # 1. BUSCA INTELIGENTE DO CABEÇALHO
-                # Procura linha que tenha "Situação" E ("ID" ou "Data")
-                header_idx = 0
-                for i in range(min(6, len(matriz))):
-                    row_txt = [str(c).lower().strip() for c in matriz[i]]
-                    # Verifica se é a linha de cabeçalho
-                    if any("situa" in x for x in row_txt) and (any("id" == x for x in row_txt) or any("data" in x for x in row_txt)):
-                        header_idx = i
-                        break
-                
-                header = matriz[header_idx]
-                rows = matriz[header_idx+1:]
-                
-                df = pd.DataFrame(rows, columns=header)
-                
-                def col_like(*checks):
-                    return _first_col_match(df.columns, *[(lambda s, c=c: c(s)) for c in checks])
-
-                cols_map = {
-                    'est': lambda s: "estação" in s or "estacao" in s or "local" in s,
-                    'situ': lambda s: "situação" in s or "situacao" in s,
-                    'id': lambda s: s == "id",
-                    'fiscal': lambda s: "fiscal" in s,
-                    
-                    # AQUI FICOU MAIS LIMPO: Busca apenas "data" ou "dia"
-                    'data': lambda s: "data" in s or "dia" in s,
-                    
-                    'hora': lambda s: "hh" in s or "hora" in s,
-                    'freq': lambda s: "frequência" in s or "frequencia" in s,
-                    'bw': lambda s: "largura" in s,
-                    'faixa': lambda s: "faixa" in s,
-                    'ident': lambda s: "identificação" in s,
-                    'autz': lambda s: "autorizado" in s,
-                    'ute': lambda s: "ute" in s,
-                    'proc': lambda s: "processo" in s,
-                    'obs': lambda s: "ocorrência" in s or "observa" in s,
-                    'cient': lambda s: "ciente" in s,
-                    'inter': lambda s: "interferente" in s
-                }
-                
-                found = {k: col_like(v) for k, v in cols_map.items()}
-                
-                if not found['situ']: continue
+                _, header = cabecalhos[nome_aba]
+                found = found_por_aba[nome_aba]
+                df = pd.DataFrame([_pad(v, len(header)) for _, v in lidas[nome_aba]], columns=header)
+                df["_linha"] = [linha for linha, _ in lidas[nome_aba]]
 
                 situ = df[found['situ']].astype(str).str.strip().str.lower()
                 pend = df[situ.eq("pendente")].copy()
                 if pend.empty: continue
 
-                out = pd.DataFrame()
-                
-                # Preenchimento inteligente dos campos principais
-                out["ID"] = pend[found['id']] if found['id'] else (pend.iloc[:, 0] if len(pend.columns)>0 else "")
-                
-                if found['est']: out["Local"] = pend[found['est']]
-                elif len(pend.columns) > 1: out["Local"] = pend.iloc[:, 1]
-                else: out["Local"] = nome_aba
-                
-                out["EstacaoRaw"] = nome_aba
-
-                # Data agora deve ser encontrada facilmente
-                if found['data']:
-                    out["Data"] = pend[found['data']]
-                else:
-                    # Fallback de segurança ainda útil
-                    if len(pend.columns) > 3: out["Data"] = pend.iloc[:, 3] 
-                    elif len(pend.columns) > 1: out["Data"] = pend.iloc[:, 1]
-                    else: out["Data"] = ""
-
-                mappings = [
-                    ("Fiscal", 'fiscal'), ("HH:mm", 'hora'),
-                    ("Frequência (MHz)", 'freq'), ("Largura (kHz)", 'bw'),
-                    ("Faixa de Frequência Envolvida", 'faixa'), ("Identificação", 'ident'),
-                    ("Autorizado?", 'autz'), ("UTE?", 'ute'), ("Processo SEI UTE", 'proc'),
-                    ("Ocorrência (observações)", 'obs'), ("Alguém mais ciente?", 'cient'),
-                    ("Interferente?", 'inter'), ("Situação", 'situ')
-                ]
-                
-                for dest, key in mappings:
-                    out[dest] = pend[found[key]] if found[key] else ""
-
+                out = _projetar_estacao(pend, found, nome_aba)
+                out["_linha"] = pend["_linha"]
                 out["Fonte"] = "ESTACAO"
                 dfs.append(out)
 
             except: pass
         
         if not dfs: return pd.DataFrame()
-        return pd.concat(dfs, ignore_index=True)
+        return _compactar_pendencias(pd.concat(dfs, ignore_index=True))
 
     except Exception:
         return pd.DataFrame()
 
-@st.cache_data(ttl=150, show_spinner=False)
-def carregar_todas_frequencias(_client, spreadsheet_id):
-    frequencias_map = {}
+@_cache_versionado(tipo="estacoes")
+def carregar_pendencias_unificadas(_client, spreadsheet_id):
+    """PAINEL + Abordagem + Estações já concatenados e compactados (uma cópia por evento no cache)"""
+    dfs = [d for d in (
+        carregar_pendencias_painel_mapeadas(_client, spreadsheet_id),
+        carregar_pendencias_abordagem_pendentes(_client, spreadsheet_id),
+        carregar_pendencias_todas_estacoes(_client, spreadsheet_id),
+    ) if not d.empty]
+    if not dfs: return pd.DataFrame()
+    # Categorias diferentes entre as fontes viram 'object' no concat; recompacta no final
+    return _compactar_pendencias(pd.concat(dfs, ignore_index=True))
+
+# Linha de um ID que aparece em mais de uma linha da aba: a gravação recusa em vez de escolher uma delas
+LINHA_DUPLICADA = 0
+
+def _indice_linhas(df: pd.DataFrame) -> Dict[tuple, int]:
+    """(aba, ID) -> linha; IDs vazios ficam de fora e IDs repetidos na mesma aba apontam para LINHA_DUPLICADA"""
+    if df.empty or "_linha" not in df.columns: return {}
+    sub = df[df["Fonte"].isin(["ABORDAGEM", "ESTACAO"]) & df["_linha"].notna()]
+    ids = sub["ID"].astype(str).str.strip()
+    sub, ids = sub[ids != ""], ids[ids != ""]
+    abas = np.where(sub["Fonte"] == "ABORDAGEM", "Abordagem", sub["EstacaoRaw"].astype(str))
+    indice = {}
+    for chave, linha in zip(zip(abas, ids), sub["_linha"].astype(int)):
+        indice[chave] = LINHA_DUPLICADA if chave in indice else linha
+    return indice
+
+@_cache_versionado(tipo="estacoes")
+def carregar_indice_linhas(_client, spreadsheet_id) -> Dict[tuple, int]:
+    """
+    (aba, ID) -> linha na planilha, anotado pelas próprias cargas de pendências (coluna _linha), sem leitura extra.
+    Só Abordagem e estações: o PAINEL é um espelho, a gravação vai sempre para a aba de origem.
+    """
+    return _indice_linhas(carregar_pendencias_unificadas(_client, spreadsheet_id))
+
+# --- AGRUPAMENTO DE REGISTROS REPETIDOS ---
+# O mesmo emissor costuma aparecer em várias estações e na Abordagem com frequência e data um pouco diferentes
+AGRUPAR_TOLERANCIA_KHZ = 12.5   # largura mínima considerada quando o registro não informa (ou informa menos)
+AGRUPAR_JANELA_DIAS = 1         # maior intervalo entre registros consecutivos do mesmo grupo
+
+def agrupar_pendencias(df: pd.DataFrame, tolerancia_khz: float = AGRUPAR_TOLERANCIA_KHZ,
+                       janela_dias: int = AGRUPAR_JANELA_DIAS) -> pd.DataFrame:
+    """
+    Acrescenta "Grupo" (G-001, G-002... em ordem de frequência) e "Registros no grupo" às pendências.
+    Duas varreduras ordenadas, O(n log n):
+      1. frequência: cada registro ocupa f ± max(largura, tolerância)/2; na ordem dos inícios, um grupo novo
+         começa quando o início não passa do maior fim visto até ali (bandas só encostadas não se juntam);
+      2. tempo: dentro de cada grupo de frequência, na ordem das datas, separa quando dois registros
+         consecutivos distam mais de janela_dias.
+    Registro sem frequência ou sem data válida fica sozinho no seu grupo.
+    """
+    if df.empty: return df.assign(**{"Grupo": pd.Series(dtype=str), "Registros no grupo": pd.Series(dtype=int)})
+    n = len(df)
+    f_khz = df["Frequência (MHz)"].to_numpy(dtype=float) * 1000.0
+    larg = np.nan_to_num(df["Largura (kHz)"].to_numpy(dtype=float)) if "Largura (kHz)" in df.columns else np.zeros(n)
+    meia = np.maximum(larg, tolerancia_khz) / 2.0
+    valido = ~np.isnan(f_khz)
+    ini = np.where(valido, np.round(f_khz - meia, 3), np.inf)
+    fim = np.where(valido, np.round(f_khz + meia, 3), -np.inf)
+
+    ordem = np.argsort(ini, kind="stable")
+    fim_acum = np.maximum.accumulate(fim[ordem])
+    novo = np.ones(n, dtype=bool)
+    novo[1:] = (ini[ordem][1:] >= fim_acum[:-1]) | ~valido[ordem][1:]
+    g_freq = np.empty(n, dtype=np.int64)
+    g_freq[ordem] = np.cumsum(novo)
+
+    datas = pd.to_datetime(df["Data"].astype(str), format="%d/%m/%Y", errors="coerce")
+    dias = ((datas - pd.Timestamp("1970-01-01")).dt.days).to_numpy(dtype=float)
+    ordem = np.lexsort((dias, g_freq))   # NaN (sem data) vai para o fim de cada grupo
+    g_o, d_o = g_freq[ordem], dias[ordem]
+    novo = np.ones(n, dtype=bool)
+    novo[1:] = (g_o[1:] != g_o[:-1]) | ~(d_o[1:] - d_o[:-1] <= janela_dias)
+    grupo = np.empty(n, dtype=np.int64)
+    grupo[ordem] = np.cumsum(novo)
+
+    return df.assign(**{
+        "Grupo": pd.Series(grupo, index=df.index).map("G-{:03d}".format).astype("category"),
+        "Registros no grupo": np.bincount(grupo)[grupo],
+    })
+
+@_cache_versionado(tipo="estacoes")
+def carregar_pendencias_agrupadas(_client, spreadsheet_id):
+    """Pendências unificadas com o grupo de cada registro (ver agrupar_pendencias)"""
+    return agrupar_pendencias(carregar_pendencias_unificadas(_client, spreadsheet_id))
+
+# --- PLACAR DE PENDÊNCIAS ---
+@st.cache_resource(show_spinner=False)
+def _placar_pendencias() -> Dict:
+    """Contagem de pendências por evento, compartilhada por todas as sessões do processo"""
+    return {"trava": threading.Lock(), "eventos": {}, "em_curso": {}}
+
+def _atributos_resumo(df: pd.DataFrame) -> Dict[str, tuple]:
+    """
+    Chave do registro (fonte|aba|linha da planilha) -> (estação, faixa, fiscal, data) usados no resumo de pendências.
+    A linha distingue o espelho do PAINEL da linha da estação e registros com ID vazio ou repetido.
+    """
+    if df.empty: return {}
+    linhas = df["_linha"] if "_linha" in df.columns else pd.Series(np.nan, index=df.index)
+    linhas = pd.Series([f"{int(l)}" if not pd.isna(l) else f"i{i}" for i, l in zip(df.index, linhas)], index=df.index)
+    chaves = df["Fonte"].astype(str) + "|" + df["EstacaoRaw"].astype(str) + "|" + linhas
+    estacao = np.where(df["Fonte"].astype(str) == "ABORDAGEM", "Abordagem", df["EstacaoRaw"].astype(str))
+
+    def _rotulo(col: str) -> List[str]:
+        vals = df[col].astype(str).str.strip() if col in df.columns else pd.Series("", index=df.index)
+        return vals.where(vals != "", "(não informado)").tolist()
+
+    datas = pd.to_datetime(df["Data"].astype(str), format="%d/%m/%Y", errors="coerce")
+    datas = [d.date() if not pd.isna(d) else None for d in datas]
+    return dict(zip(chaves.tolist(), zip(estacao.tolist(), _rotulo("Faixa de Frequência Envolvida"), _rotulo("Fiscal"), datas)))
+
+def _recontar_placar(_client, spreadsheet_id, versao):
+    placar = _placar_pendencias()
+    _contexto_leitura.sem_desatualizado = True  # contagem da versão nova, nunca do snapshot antigo
     try:
-        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        
-        # 1. PAINEL (B:G)
-        aba_painel = planilha.worksheet("PAINEL")
-        dados_painel = aba_painel.get("B2:G")
-        for row in dados_painel:
-            if len(row) >= 6:
-                estacao, freq = row[0], row[5]
-                if estacao and freq:
-                    try:
-                        f_val = round(float(str(freq).replace(",", ".")), 3)
-                        if f_val not in frequencias_map:
-                            frequencias_map[f_val] = estacao
-                    except: pass
-        
-        # 2. Abordagem (I:M)
-        aba_abord = planilha.worksheet("Abordagem")
-        dados_abord = aba_abord.get("I2:M")
-        for row in dados_abord:
-            if len(row) >= 5:
-                regiao, freq = row[0], row[4]
-                if regiao and freq:
-                    try:
-                        f_val = round(float(str(freq).replace(",", ".")), 3)
-                        if f_val not in frequencias_map:
-                            frequencias_map[f_val] = regiao
-                    except: pass
-    except: pass
-    return frequencias_map
+        df = carregar_pendencias_agrupadas(_client, spreadsheet_id)
+        atributos = _atributos_resumo(df)
+        with placar["trava"]:
+            anterior = placar["eventos"].get(spreadsheet_id)
+            placar["eventos"][spreadsheet_id] = {
+                # Contagem por (estação, faixa, fiscal, data), refeita a cada versão junto com o total
+                "versao": versao, "total": len(df), "chaves": set(atributos),
+                "resumo": Counter(atributos.values()),
+                "grupos": df["Grupo"].nunique() if not df.empty else 0,
+                "novas": len(atributos.keys() - anterior["chaves"]) if anterior else 0,
+                "seq": anterior["seq"] + 1 if anterior else 1,
+            }
+    finally:
+        _contexto_leitura.sem_desatualizado = False
+        with placar["trava"]:
+            placar["em_curso"].pop((spreadsheet_id, versao), None)
+
+# Faixas de idade da pendência (dias desde a data registrada), na ordem das colunas do resumo
+FAIXAS_IDADE = [(0, "Hoje"), (2, "1-2 dias"), (7, "3-7 dias"), (None, "+7 dias")]
+
+def _faixa_idade(data: Optional[date], hoje: date) -> str:
+    if data is None: return "Sem data"
+    dias = (hoje - data).days
+    for limite, rotulo in FAIXAS_IDADE:
+        if limite is None or dias <= limite: return rotulo
+
+def tabela_resumo_pendencias(resumo: Counter, dimensao: str, hoje: date) -> pd.DataFrame:
+    """Pivô do resumo materializado no placar: uma linha por estação/faixa/fiscal, colunas por idade"""
+    pos = {"Estação": 0, "Faixa": 1, "Fiscal": 2}[dimensao]
+    linhas = Counter()
+    for chave, n in resumo.items():
+        linhas[(chave[pos], _faixa_idade(chave[3], hoje))] += n
+    idades = [r for _, r in FAIXAS_IDADE] + ["Sem data"]
+    tabela = pd.Series(linhas).unstack(fill_value=0).reindex(columns=idades, fill_value=0)
+    if not tabela["Sem data"].any(): tabela = tabela.drop(columns="Sem data")
+    tabela.index.name = dimensao
+    return tabela.assign(Total=tabela.sum(axis=1)).sort_values("Total", ascending=False)
+
+def _placar_atual(_client, spreadsheet_id) -> tuple:
+    """
+    (último registro conhecido do evento, recontagem em curso ou None). Não bloqueia: se a versão da planilha
+    mudou, agenda uma única recontagem no pool para o processo todo e devolve o registro anterior enquanto isso.
+    """
+    placar = _placar_pendencias()
+    versao = _versao_planilha(_client, spreadsheet_id)
+    with placar["trava"]:
+        registro = placar["eventos"].get(spreadsheet_id)
+        futuro = placar["em_curso"].get((spreadsheet_id, versao))
+        if futuro is None and (registro is None or registro["versao"] != versao):
+            futuro = placar["em_curso"][(spreadsheet_id, versao)] = _submeter(_recontar_placar, _client, spreadsheet_id, versao)
+    return registro, futuro
 
 # ===================== FUNÇÕES DE ESCRITA =====================
 
-def atualizar_campos_na_aba_mae(_client, spreadsheet_id, estacao_raw, id_ocorrencia, novos_valores: Dict[str, str]) -> str:
-    try:
-        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        aba_nome = estacao_raw
-        try:
-            aba = planilha.worksheet(aba_nome)
-        except:
-            return f"ERRO: Aba '{aba_nome}' não encontrada na planilha."
+def _localizar_por_id(planilha, aba: str, col_id: str, primeira_linha: int, id_registro: str) -> Optional[int]:
+    """
+    Lê a coluna de IDs uma vez e procura o ID por igualdade exata (o find do gspread casa trechos).
+    None se não achar (ou ID vazio); LINHA_DUPLICADA se o ID aparece em mais de uma linha.
+    """
+    if not id_registro: return None
+    ids = planilha.values_get(_intervalo(aba, f"{col_id}{primeira_linha}:{col_id}")).get("values", [])
+    achadas = [primeira_linha + i for i, r in enumerate(ids) if r and str(r[0]).strip() == id_registro]
+    if len(achadas) > 1: return LINHA_DUPLICADA
+    return achadas[0] if achadas else None
+
+def _celula(vr: Dict) -> str:
+    vals = vr.get("values") or [[]]
+    return str(vals[0][0]).strip() if vals[0] else ""
+
+def _mesclar_campos(campos: Dict[str, str], originais: Dict[str, str], atuais: Dict[str, str]) -> tuple:
+    """(a gravar, conflitos {coluna: valor atual}, colunas mantidas) — regras em _gravar_por_id"""
+    gravar, conflitos, mantidos = {}, {}, []
+    for col, novo in campos.items():
+        if col not in originais or col not in atuais:
+            gravar[col] = novo
+            continue
+        novo_s, orig, atual = str(novo).strip(), str(originais[col]).strip(), atuais[col]
+        if atual == orig:
+            if novo_s != orig: gravar[col] = novo
+        elif novo_s == orig: mantidos.append(col)
+        elif novo_s != atual: conflitos[col] = atual
+    return gravar, conflitos, mantidos
+
+def _gravar_lote(planilha, pedidos: List[Dict]) -> List[tuple]:
+    """
+    Várias gravações de _gravar_por_id com uma batchGet de conferência e uma escrita em lote para todas.
+    Cada pedido: {"aba", "col_id", "primeira_linha", "id", "linha", "campos", "originais"}.
+    Devolve um (linha, conflitos, mantidos) por pedido, na mesma ordem; pedido com conflito não grava nada.
+    """
+    def _faixas(p: Dict, n: int) -> List[str]:
+        return [_intervalo(p["aba"], f"{c}{n}") for c in [p["col_id"]] + list(p["campos"])]
+
+    faixas = [f for p in pedidos if p.get("linha") for f in _faixas(p, p["linha"])]
+    resp = iter(planilha.values_batch_get(faixas).get("valueRanges", []) if faixas else [])
+
+    resultados, escrita = [], []
+    for p in pedidos:
+        id_registro = str(p["id"]).strip()
+        originais = p.get("originais") or {}
+        cols, linha, atuais = list(p["campos"]), p.get("linha"), None
+        if linha == LINHA_DUPLICADA:
+            resultados.append((LINHA_DUPLICADA, {}, []))
+            continue
+        if linha:
+            id_atual, *valores = [_celula(next(resp, {})) for _ in range(len(cols) + 1)]
+            if id_atual == id_registro: atuais = dict(zip(cols, valores))
+        if atuais is None:
+            # Linha mudou de lugar: relocaliza pela coluna de IDs
+            linha = _localizar_por_id(planilha, p["aba"], p["col_id"], p["primeira_linha"], id_registro)
+            if not linha:
+                resultados.append((linha, {}, []))
+                continue
+            if originais:
+                lidos = planilha.values_batch_get(_faixas(p, linha)).get("valueRanges", [])
+                atuais = dict(zip(cols, [_celula(vr) for vr in lidos][1:]))
+            else:
+                atuais = {}
 
-        header = aba.row_values(1)
-        cell = aba.find(str(id_ocorrencia), in_column=1)
-        if not cell: return f"ERRO: ID {id_ocorrencia} não encontrado."
-        
-        def find_col(*checks):
-            for idx, name in enumerate(header, start=1):
-                s = (name or "").strip().lower()
-                for p in checks:
-                    if p(s): return idx
-            return None
+        gravar, conflitos, mantidos = _mesclar_campos(p["campos"], originais, atuais)
+        if not conflitos:
+            escrita += [{"range": _intervalo(p["aba"], f"{col}{linha}"), "values": [[v]]} for col, v in gravar.items()]
+        resultados.append((linha, conflitos, mantidos))
 
-        cols_idx = {
-            "Situação": find_col(lambda s: s == "situação" or s == "situacao"),
-            "Identificação": find_col(lambda s: "identificação" in s),
-            "Autorizado?": find_col(lambda s: "autorizado" in s),
-            "UTE?": find_col(lambda s: "ute" in s),
-            "Processo SEI UTE": find_col(lambda s: "processo" in s),
-            "Ocorrência (observações)": find_col(lambda s: "ocorrência" in s),
-            "Alguém mais ciente?": find_col(lambda s: "ciente" in s),
-            "Interferente?": find_col(lambda s: "interferente" in s)
-        }
+    if escrita:
+        planilha.values_batch_update({"valueInputOption": "USER_ENTERED", "data": escrita})
+    return resultados
 
-        updates = []
-        for key, val in novos_valores.items():
-            if key in cols_idx and cols_idx[key]:
-                updates.append((cell.row, cols_idx[key], val))
+def _gravar_por_id(planilha, aba: str, col_id: str, primeira_linha: int, id_registro, linha: Optional[int],
+                   campos: Dict[str, str], originais: Optional[Dict[str, str]] = None) -> tuple:
+    """
+    Grava {coluna: valor} na linha do registro numa única escrita em lote.
+    Devolve (linha gravada, None se não achou ou LINHA_DUPLICADA se o ID se repete na aba,
+    conflitos {coluna: valor atual}, colunas mantidas).
+
+    A linha vem do índice das cargas; uma batchGet confere que a célula de ID ainda é a do registro
+    (a API não tem escrita condicional) e, na mesma chamada, traz os valores atuais dos campos.
+    Com `originais` ({coluna: valor quando o registro foi aberto}) o controle é otimista:
+    - só o usuário mudou o campo: grava; ninguém mudou: não grava;
+    - só outra pessoa mudou: fica o valor dela (merge);
+    - os dois mudaram para valores diferentes: conflito, nada é gravado.
+    """
+    return _gravar_lote(planilha, [{"aba": aba, "col_id": col_id, "primeira_linha": primeira_linha, "id": id_registro,
+                                    "linha": linha, "campos": campos, "originais": originais}])[0]
+
+def _mensagem_gravacao(mensagem_ok: str, nomes: Dict[str, str], conflitos: Dict[str, str], mantidos: List[str]) -> str:
+    """Texto para o usuário a partir do resultado de _gravar_por_id (nomes: coluna -> nome do campo)"""
+    if conflitos:
+        detalhes = "; ".join(f"{nomes[c]}: \"{v}\"" for c, v in conflitos.items())
+        return f"ERRO: outro usuário alterou este registro depois que você o abriu ({detalhes}). Nada foi gravado; reabra o registro e refaça a edição."
+    if mantidos:
+        return f"{mensagem_ok} Mantidas as alterações de outro usuário em: {', '.join(nomes[c] for c in mantidos)}."
+    return mensagem_ok
+
+def _colunas_edicao(_client, spreadsheet_id, aba: str) -> Optional[tuple]:
+    """
+    (coluna do ID, primeira linha de dados, {campo editável: coluna}) da aba de origem de um registro,
+    ou None se a aba não existe. Abordagem pelo layout do evento; estações pelo cabeçalho em cache.
+    """
+    if aba == "Abordagem":
+        cols = _colunas_abordagem(carregar_layout_evento(_client, spreadsheet_id))
+        # Campos editáveis -> coluna no bloco de dados (padrão P..W)
+        return cols["ID"], 2, {k: cols[k] for k in CAMPOS_EDITAVEIS}
+
+    # Cabeçalho já em cache (e na linha certa, mesmo quando a estação tem título acima dele)
+    cab = carregar_cabecalhos_abas(_client, spreadsheet_id).get(aba)
+    if not cab: return None
+    linha_cab, header = cab
+
+    def find_col(*checks):
+        for idx, name in enumerate(header, start=1):
+            s = (name or "").strip().lower()
+            for p in checks:
+                if p(s): return idx
+        return None
 
-        for r, c, v in updates:
-            aba.update_cell(r, c, v)
+    cols_idx = {
+        "Situação": find_col(lambda s: s == "situação" or s == "situacao"),
+        "Identificação": find_col(lambda s: "identificação" in s),
+        "Autorizado?": find_col(lambda s: "autorizado" in s),
+        "UTE?": find_col(lambda s: "ute" in s),
+        "Processo SEI UTE": find_col(lambda s: "processo" in s),
+        "Ocorrência (observações)": find_col(lambda s: "ocorrência" in s),
+        "Alguém mais ciente?": find_col(lambda s: "ciente" in s),
+        "Interferente?": find_col(lambda s: "interferente" in s)
+    }
+    col_id = _col_letter(find_col(lambda s: s == "id") or 1)
+    return col_id, linha_cab + 1, {key: _col_letter(idx) for key, idx in cols_idx.items() if idx}
 
-        return f"Atualizado na aba '{aba.title}'."
+def atualizar_campos_na_aba_mae(_client, spreadsheet_id, estacao_raw, id_ocorrencia, novos_valores: Dict[str, str],
+                                originais: Optional[Dict[str, str]] = None) -> str:
+    try:
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        aba_nome = estacao_raw
+        edicao = _colunas_edicao(_client, spreadsheet_id, aba_nome)
+        if not edicao: return f"ERRO: Aba '{aba_nome}' não encontrada na planilha."
+        col_id, primeira_linha, letras = edicao
+
+        nomes = {letra: key for key, letra in letras.items()}
+        campos = {letras[key]: val for key, val in novos_valores.items() if key in letras}
+        orig = {letras[key]: val for key, val in (originais or {}).items() if key in letras}
+        linha = carregar_indice_linhas(_client, spreadsheet_id).get((aba_nome, str(id_ocorrencia).strip()))
+        linha, conflitos, mantidos = _gravar_por_id(planilha, aba_nome, col_id, primeira_linha, id_ocorrencia, linha, campos, orig)
+        if linha == LINHA_DUPLICADA: return f"ERRO: ID {id_ocorrencia} aparece em mais de uma linha da aba '{aba_nome}'. Nada foi gravado."
+        if not linha: return f"ERRO: ID {id_ocorrencia} não encontrado."
+
+        if not conflitos: _invalidar_versao(_client, spreadsheet_id)
+        return _mensagem_gravacao(f"Atualizado na aba '{aba_nome}'.", nomes, conflitos, mantidos)
     except Exception as e:
         return f"ERRO ao atualizar: {e}"
 
-def atualizar_campos_abordagem_por_id(_client, spreadsheet_id, id_h: str, novos_valores: Dict[str, str]) -> str:
+def atualizar_campos_abordagem_por_id(_client, spreadsheet_id, id_h: str, novos_valores: Dict[str, str],
+                                      originais: Optional[Dict[str, str]] = None) -> str:
     try:
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        aba = planilha.worksheet("Abordagem")
-        cell = aba.find(str(id_h), in_column=_col_to_index("H"))
-        if not cell: return "Registro não encontrado."
-        
-        col_map = {
-            "Identificação": "P", "Autorizado?": "Q", "UTE?": "R",
-            "Processo SEI UTE": "S", "Ocorrência (observações)": "T",
-            "Alguém mais ciente?": "U", "Interferente?": "V", "Situação": "W"
-        }
-        
-        for k, v in novos_valores.items():
-            if k in col_map:
-                aba.update_cell(cell.row, _col_to_index(col_map[k]), v)
-        return "Alterações salvas na 'Abordagem'."
+        col_id, primeira_linha, col_map = _colunas_edicao(_client, spreadsheet_id, "Abordagem")
+
+        campos = {col_map[k]: v for k, v in novos_valores.items() if k in col_map}
+        orig = {col_map[k]: v for k, v in (originais or {}).items() if k in col_map}
+        linha = carregar_indice_linhas(_client, spreadsheet_id).get(("Abordagem", str(id_h).strip()))
+        linha, conflitos, mantidos = _gravar_por_id(planilha, "Abordagem", col_id, primeira_linha, id_h, linha, campos, orig)
+        if linha == LINHA_DUPLICADA: return f"ERRO: ID {id_h} aparece em mais de uma linha da 'Abordagem'. Nada foi gravado."
+        if not linha: return "Registro não encontrado."
+        if not conflitos: _invalidar_versao(_client, spreadsheet_id)
+        return _mensagem_gravacao("Alterações salvas na 'Abordagem'.", {c: k for k, c in col_map.items()}, conflitos, mantidos)
     except Exception as e:
         return f"Erro: {e}"
 
+def atualizar_grupo(_client, spreadsheet_id, membros: pd.DataFrame, novos_valores: Dict[str, str]) -> str:
+    """
+    Aplica os mesmos valores a todos os registros de um grupo (agrupar_pendencias) numa única escrita em lote.
+    Cada registro é conferido contra os valores com que foi carregado, como na edição individual:
+    o que outro usuário alterou nesse meio-tempo não é sobrescrito. Membro de aba que não existe mais
+    fica de fora e é relatado; os demais são gravados.
+    """
+    try:
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        indice = carregar_indice_linhas(_client, spreadsheet_id)
+        edicoes, pedidos, vistos, sem_aba = {}, [], set(), []
+        for _, reg in membros.iterrows():
+            # PAINEL é espelho: grava na aba da estação, como na edição individual
+            aba = "Abordagem" if reg["Fonte"] == "ABORDAGEM" else str(reg["EstacaoRaw"])
+            id_reg = str(reg["ID"]).strip()
+            if (aba, id_reg) in vistos: continue
+            vistos.add((aba, id_reg))
+            if aba not in edicoes: edicoes[aba] = _colunas_edicao(_client, spreadsheet_id, aba)
+            if not edicoes[aba]:
+                sem_aba.append(f"{id_reg} (aba '{aba}' não encontrada)")
+                continue
+            col_id, primeira_linha, letras = edicoes[aba]
+            pedidos.append({
+                "aba": aba, "col_id": col_id, "primeira_linha": primeira_linha, "id": id_reg,
+                "linha": indice.get((aba, id_reg)),
+                "campos": {letras[k]: v for k, v in novos_valores.items() if k in letras},
+                "originais": {letras[k]: str(reg.get(k, "")) for k in novos_valores if k in letras},
+            })
+
+        resultados = _gravar_lote(planilha, pedidos)
+        gravados = [p["id"] for p, (linha, conflitos, _) in zip(pedidos, resultados) if linha and not conflitos]
+        motivo = lambda linha: ("ID repetido na aba" if linha == LINHA_DUPLICADA
+                                else "alterado por outro usuário" if linha else "não encontrado")
+        falhas = sem_aba + [f"{p['id']} ({motivo(linha)})"
+                            for p, (linha, conflitos, _) in zip(pedidos, resultados) if not linha or conflitos]
+
+        if gravados: _invalidar_versao(_client, spreadsheet_id)
+        if not gravados: return f"ERRO: nenhum registro do grupo foi gravado: {', '.join(falhas)}."
+        msg = f"{len(gravados)} de {len(pedidos) + len(sem_aba)} registros do grupo atualizados."
+        return msg + (f" Não gravados: {', '.join(falhas)}." if falhas else "")
+    except Exception as e:
+        return f"ERRO ao atualizar o grupo: {e}"
+
 def inserir_emissao_I_W(_client, spreadsheet_id, dados_formulario: Dict[str, str]) -> bool:
     try:
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
         aba = planilha.worksheet("Abordagem")
-        row = _first_row_where_col_empty(aba, "M", start_row=2)
-        next_id = _next_sequential_id(aba, col_letter="H", start_row=2)
+        cols = _colunas_abordagem(carregar_layout_evento(_client, spreadsheet_id))
+        row = _first_row_where_col_empty(aba, cols["Frequência (MHz)"], start_row=2)
+        next_id = _next_sequential_id(aba, col_letter=cols["ID"], start_row=2)
 
         dia = dados_formulario.get("Dia")
         if hasattr(dia, "strftime"): dia = dia.strftime("%d/%m/%Y")
@@ -966,27 +1852,67 @@ def inserir_emissao_I_W(_client, spreadsheet_id, dados_formulario: Dict[str, str
             dados_formulario.get("Situação", "Pendente"),
         ]
 
-        aba.update(f"H{row}", [[str(next_id)]], value_input_option="RAW")
-        aba.update(f"I{row}:W{row}", [vals], value_input_option="RAW")
+        aba.update(f"{cols['ID']}{row}", [[str(next_id)]], value_input_option="RAW")
+        aba.update(f"{cols['Local']}{row}:{cols['Situação']}{row}", [vals], value_input_option="RAW")
+        _invalidar_versao(_client, spreadsheet_id)
         return True
     except Exception as e:
         st.error(f"Erro inserção: {e}")
         return False
 
+def inserir_emissoes_em_lote(_client, spreadsheet_id, linhas: pd.DataFrame) -> str:
+    """
+    Grava várias emissões (colunas Local..Situação de COLS_ABORDAGEM_HW) logo abaixo da última linha usada
+    do bloco da Abordagem, com IDs Abo-XX contíguos. Uma leitura em lote (colunas de ID e de frequência)
+    e uma única escrita para todas as linhas.
+    """
+    try:
+        if linhas.empty: return "ERRO: nenhuma emissão para importar."
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        cols = _colunas_abordagem(carregar_layout_evento(_client, spreadsheet_id))
+        resp = planilha.values_batch_get([
+            _intervalo("Abordagem", f"{cols['ID']}2:{cols['ID']}"),
+            _intervalo("Abordagem", f"{cols['Frequência (MHz)']}2:{cols['Frequência (MHz)']}"),
+        ]).get("valueRanges", [])
+        ids, freqs = [[str(r[0]).strip() if r else "" for r in vr.get("values", [])] for vr in resp]
+
+        # Última linha com ID ou frequência: as novas entram todas depois dela, sem lacunas no meio
+        usadas = [i for i, (a, b) in enumerate(zip(ids + [""] * len(freqs), freqs + [""] * len(ids))) if a or b]
+        primeira = (usadas[-1] + 3) if usadas else 2
+        proximo = _maior_numero_abo(ids) + 1
+
+        corpo = linhas[COLS_ABORDAGEM_HW[1:]].astype(object).where(linhas[COLS_ABORDAGEM_HW[1:]].notna(), "")
+        valores = [[f"Abo-{proximo + i:02d}"] + v for i, v in enumerate(corpo.values.tolist())]
+        ultima = primeira + len(valores) - 1
+        planilha.values_batch_update({
+            "valueInputOption": "RAW",
+            "data": [{"range": _intervalo("Abordagem", f"{cols['ID']}{primeira}:{cols['Situação']}{ultima}"), "values": valores}],
+        })
+        _invalidar_versao(_client, spreadsheet_id)
+        return f"{len(valores)} emissões importadas na Abordagem ({valores[0][0]} a {valores[-1][0]}, linhas {primeira} a {ultima})."
+    except Exception as e:
+        return f"ERRO na importação: {e}"
+
 def inserir_bsr_erb(_client, spreadsheet_id, tipo, regiao, lat, lon) -> str:
     try:
         planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        aba = planilha.worksheet("Abordagem")
-        row = _first_empty_row_in_block(aba, "X", "AC")
+        ini, fim = _bloco(carregar_layout_evento(_client, spreadsheet_id)["abordagem_bsr"])
+        row = _first_empty_row_in_block(planilha, "Abordagem", ini, fim)
         
-        coords = [[lat or "", lon or ""]]
+        # Bloco BSR/ERB (padrão X:AC): BSR, Local BSR, ERB, Local ERB, Lat, Lon
+        desloc = 0 if tipo == "BSR/Jammer" else 2
+        marcador = f"{_deslocar_coluna(ini, desloc)}{row}:{_deslocar_coluna(ini, desloc + 1)}{row}"
+        coords = f"{_deslocar_coluna(ini, 4)}{row}:{_deslocar_coluna(ini, 5)}{row}"
         
-        if tipo == "BSR/Jammer":
-            aba.update(f"X{row}:Y{row}", [["1", regiao]], value_input_option="USER_ENTERED")
-        else:
-            aba.update(f"Z{row}:AA{row}", [["1", regiao]], value_input_option="USER_ENTERED")
-        
-        aba.update(f"AB{row}:AC{row}", coords, value_input_option="USER_ENTERED")
+        # Marcador, região e coordenadas numa única escrita em lote
+        planilha.values_batch_update({
+            "valueInputOption": "USER_ENTERED",
+            "data": [
+                {"range": _intervalo("Abordagem", marcador), "values": [["1", regiao]]},
+                {"range": _intervalo("Abordagem", coords), "values": [[lat or "", lon or ""]]},
+            ],
+        })
+        _invalidar_versao(_client, spreadsheet_id)
         return f"'{tipo}' incluído com sucesso."
     except Exception as e:
         return f"ERRO: {e}"
@@ -995,62 +1921,617 @@ def inserir_bsr_erb(_client, spreadsheet_id, tipo, regiao, lat, lon) -> str:
 def carregar_opcoes_identificacao(_client, spreadsheet_id):
     """Tenta carregar opções de qualquer aba de estação disponível"""
     try:
-        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
-        todas = planilha.worksheets()
-        
-        # Procura a primeira aba que não seja do sistema
-        aba_alvo = None
-        for ws in todas:
-            if ws.title not in ABAS_SISTEMA:
-                aba_alvo = ws
-                break
+        # Primeira aba que não seja do sistema
+        estacoes = listar_abas_estacoes(_client, spreadsheet_id)
         
-        if aba_alvo:
-            # Assume que a validação de dados está na coluna AC (padrão)
-            return [i[0] for i in aba_alvo.get('AC2:AC7') if i]
+        if estacoes:
+            # A validação de dados fica no intervalo do layout (padrão AC2:AC7)
+            intervalo = carregar_layout_evento(_client, spreadsheet_id)["opcoes_identificacao"]
+            planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+            return [i[0] for i in planilha.values_get(_intervalo(estacoes[0], intervalo)).get("values", []) if i]
         return ["Opções não encontradas"]
     except:
         return ["Opção genérica (erro leitura)"]
 
-def _buscar_por_texto_livre(client, spreadsheet_id, termos: str, abas: List[str]) -> pd.DataFrame:
-    planilha = abrir_planilha_selecionada(client, spreadsheet_id)
-    resultados = []
+def _preparar_janela_busca(nome: str, vals: List[List[str]], header: List[str]) -> pd.DataFrame:
+    """Uma janela de linhas cruas -> só as colunas padronizadas + texto normalizado, sem as linhas vazias"""
+    if nome == "Abordagem":
+        cru = _matriz_para_df(vals, len(COLS_ABORDAGEM_HW), COLS_ABORDAGEM_HW)
+        df = cru.copy()
+        df["EstacaoRaw"] = "ABORDAGEM"
+    else:
+        cru = _matriz_para_df(vals, len(header), header)
+        cru = cru.iloc[:, ~cru.columns.duplicated()]
+        df = _projetar_estacao(cru, _mapear_colunas_estacao(list(cru.columns)), nome)
+
+    # Texto de todas as colunas cruas, normalizado uma vez só (sem acento, minúsculo)
+    texto = cru.astype(str).agg(" ".join, axis=1)
+    df["_texto"] = texto.str.normalize("NFD").str.replace("[\u0300-\u036f]", "", regex=True).str.lower()
+    df = df[texto.str.strip() != ""]
+
+    df.insert(0, "Aba/Origem", nome)
+    df["Fonte"] = "BUSCA"
+    return df
+
+@_cache_versionado(tipo="busca")
+def carregar_base_busca(_client, spreadsheet_id) -> pd.DataFrame:
+    """
+    Abordagem + todas as estações, lidas em janelas de linhas (uma batchGet por rodada), com colunas padronizadas
+    e tipadas (frequência/largura numéricas, data em datetime) e o texto normalizado de cada linha já calculado.
+    Cada janela é projetada e descartada antes da próxima: a matriz crua de uma aba inteira nunca fica em memória.
+    """
+    try:
+        estacoes = listar_abas_estacoes(_client, spreadsheet_id)
+        cabecalhos = carregar_cabecalhos_abas(_client, spreadsheet_id)
+        estacoes = [e for e in estacoes if e in cabecalhos]
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        ini, fim = _bloco(carregar_layout_evento(_client, spreadsheet_id)["abordagem_dados"])
+
+        pedidos = {"Abordagem": ("Abordagem", 2, ini, fim)}
+        for nome in estacoes:
+            linha_cab, header = cabecalhos[nome]
+            pedidos[nome] = (nome, linha_cab + 1, "A", _col_letter(len(header)))
+
+        # As rodadas intercalam as abas; agrupa por aba para manter a ordem de leitura de antes
+        por_aba = {nome: [] for nome in pedidos}
+        for nome, _, vals in _janelas_de_linhas(planilha, pedidos, carregar_linhas_abas(_client, spreadsheet_id)):
+            df = _preparar_janela_busca(nome, vals, cabecalhos.get(nome, (0, []))[1])
+            if not df.empty: por_aba[nome].append(df)
+        partes = [df for dfs in por_aba.values() for df in dfs]
+
+        if not partes: return pd.DataFrame()
+        base = _compactar_pendencias(pd.concat(partes, ignore_index=True))
+        base["_data"] = _para_data(base["Data"])
+        return base
+    except Exception:
+        return pd.DataFrame()
+
+def _buscar_por_texto_livre(client, spreadsheet_id, termos: str, abas: List[str], filtros: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Filtra a base em cache com máscaras vetorizadas: texto livre (opcional) + filtros estruturados.
+    filtros: freq_min/freq_max (MHz), data_ini/data_fim (date), situacao/identificacao/interferente (listas)
+    """
+    base = carregar_base_busca(client, spreadsheet_id)
+    if base.empty: return pd.DataFrame()
+    filtros = filtros or {}
+
+    mask = base["Aba/Origem"].isin(abas)
     termos_norm = _normalize_text(termos)
+    if termos_norm:
+        mask &= base["_texto"].str.contains(termos_norm, regex=False)
+
+    freq = base["Frequência (MHz)"]
+    if filtros.get("freq_min") is not None: mask &= freq >= filtros["freq_min"]
+    if filtros.get("freq_max") is not None: mask &= freq <= filtros["freq_max"]
+    if filtros.get("data_ini") is not None: mask &= base["_data"] >= pd.Timestamp(filtros["data_ini"])
+    if filtros.get("data_fim") is not None: mask &= base["_data"] <= pd.Timestamp(filtros["data_fim"])
+
+    for chave, coluna in (("situacao", "Situação"), ("identificacao", "Identificação"), ("interferente", "Interferente?")):
+        if filtros.get(chave):
+            mask &= base[coluna].isin(filtros[chave])
+
+    achados = base[mask]
+    return achados.drop(columns=[c for c in achados.columns if c.startswith("_")]).reset_index(drop=True)
+
+# ===================== EXPORTAÇÃO =====================
+
+# Bloco BSR/Jammer e ERB Fake da Abordagem (X:AC), na ordem das colunas
+COLS_ABORDAGEM_XAC = ["BSR/Jammer", "Local BSR/Jammer", "ERB Fake", "Local ERB Fake", "Latitude", "Longitude"]
+
+@_cache_versionado(tipo="exportacao")
+def carregar_exportacao_evento(_client, spreadsheet_id) -> Dict[str, pd.DataFrame]:
+    return _extrair_evento(_client, spreadsheet_id)
+
+def _extrair_evento(_client, spreadsheet_id) -> Dict[str, pd.DataFrame]:
+    """
+    Todo o evento (PAINEL, Abordagem H:W e X:AC, Tabela UTE e estações) em janelas de linhas, uma batchGet por
+    rodada, normalizado pelos mesmos mapeamentos de colunas das cargas de pendências. Cada janela já sai projetada.
+    """
+    cabecalhos = carregar_cabecalhos_abas(_client, spreadsheet_id)
+    estacoes = [e for e in listar_abas_estacoes(_client, spreadsheet_id) if e in cabecalhos]
+    planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+    layout = carregar_layout_evento(_client, spreadsheet_id)
+    dados_ini, dados_fim = _bloco(layout["abordagem_dados"])
+    bsr_ini, bsr_fim = _bloco(layout["abordagem_bsr"])
+    ute_fim = _col_letter(max(_col_to_index(layout[k]) for k in ("ute_col_entidade", "ute_col_local", "ute_col_freq", "ute_col_sei")))
+
+    linha_painel, header_painel = cabecalhos.get("PAINEL", (1, []))
+    found_painel = _mapear_colunas(header_painel, MAPA_COLS_PAINEL)
+    pedidos = {
+        "Abordagem": ("Abordagem", 2, dados_ini, dados_fim),
+        "Abordagem BSR": ("Abordagem", 2, bsr_ini, bsr_fim),
+        "Tabela UTE": ("Tabela UTE", 2, "A", ute_fim),
+    }
+    if found_painel['est'] and found_painel['id']:
+        pedidos["PAINEL"] = ("PAINEL", linha_painel + 1, "A", _col_letter(len(header_painel)))
+    for e in estacoes:
+        pedidos[e] = (e, cabecalhos[e][0] + 1, "A", _col_letter(len(cabecalhos[e][1])))
+
+    # As rodadas intercalam as abas; as emissões são agrupadas por aba (PAINEL, Abordagem, estações) no final
+    por_aba, bsr, ute = {"PAINEL": [], "Abordagem": [], **{e: [] for e in estacoes}}, [], []
+    for chave, _, vals in _janelas_de_linhas(planilha, pedidos, carregar_linhas_abas(_client, spreadsheet_id)):
+        if chave == "Abordagem BSR":
+            bsr.append(_matriz_para_df(vals, len(COLS_ABORDAGEM_XAC), COLS_ABORDAGEM_XAC))
+        elif chave == "Tabela UTE":
+            ute.append(_projetar_ute(vals, layout))
+        elif chave == "PAINEL":
+            cru = _matriz_para_df(vals, len(header_painel), header_painel)
+            por_aba[chave].append(_projetar_painel(cru, found_painel).assign(**{"Aba/Origem": "PAINEL"}))
+        elif chave == "Abordagem":
+            df = _matriz_para_df(vals, len(COLS_ABORDAGEM_HW), COLS_ABORDAGEM_HW)
+            por_aba[chave].append(df.assign(EstacaoRaw="ABORDAGEM", **{"Aba/Origem": "Abordagem"}))
+        else:
+            header = cabecalhos[chave][1]
+            cru = _matriz_para_df(vals, len(header), header)
+            cru = cru.iloc[:, ~cru.columns.duplicated()]
+            por_aba[chave].append(_projetar_estacao(cru, _mapear_colunas_estacao(list(cru.columns)), chave).assign(**{"Aba/Origem": chave}))
+
+    emissoes = [df for dfs in por_aba.values() for df in dfs]
+    df_emissoes = pd.DataFrame()
+    if emissoes:
+        df_emissoes = pd.concat(emissoes, ignore_index=True)
+        # Linhas totalmente vazias (sobras de formatação da planilha) não entram
+        df_emissoes = df_emissoes[(df_emissoes.drop(columns=["EstacaoRaw", "Aba/Origem"]).astype(str) != "").any(axis=1)]
+        df_emissoes = _compactar_pendencias(df_emissoes.reset_index(drop=True))
+        df_emissoes["Data (dt)"] = _para_data(df_emissoes["Data"])
+
+    df_bsr = pd.concat(bsr, ignore_index=True) if bsr else pd.DataFrame()
+    df_ute = pd.concat(ute, ignore_index=True) if ute else pd.DataFrame()
+    if not df_ute.empty: df_ute["Frequência (MHz)"] = _para_numero(df_ute["Frequência (MHz)"])
+
+    return {"emissoes": df_emissoes, "tabela_ute": df_ute, "bsr_erb": df_bsr}
+
+def _gerar_arquivos_exportacao(dados: Dict[str, pd.DataFrame]) -> tuple:
+    """(Parquet tipado das emissões, ZIP com um CSV por tabela) — escritos direto nos buffers"""
+    buf_parquet = io.BytesIO()
+    dados["emissoes"].to_parquet(buf_parquet, index=False)
+
+    buf_zip = io.BytesIO()
+    with zipfile.ZipFile(buf_zip, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for nome, df in dados.items():
+            with z.open(f"{nome}.csv", "w") as f, io.TextIOWrapper(f, encoding="utf-8-sig", newline="") as txt:
+                df.to_csv(txt, index=False)
+    return buf_parquet.getvalue(), buf_zip.getvalue()
+
+# ===================== PAINEL MULTI-EVENTOS =====================
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def calcular_resumo_evento(_client, spreadsheet_id, modificado: str) -> Dict:
+    """
+    Agregados de um evento. A chave inclui o modifiedTime do Drive: enquanto a planilha
+    não mudar, o resultado vem do cache; quando muda, só esse evento é recalculado.
+    """
+    dados = _extrair_evento(_client, spreadsheet_id)
+    em = dados["emissoes"]
+    if em.empty:
+        return {"pendentes": 0, "emissoes": 0, "interferentes": 0, "atos_ute": len(dados["tabela_ute"]), "por_faixa": {}}
+    
+    situ = em["Situação"].astype(str).str.strip().str.lower()
+    interf = em["Interferente?"].astype(str).str.strip().str.lower()
+    faixa = em["Faixa de Frequência Envolvida"].astype(str).str.strip()
+    return {
+        "pendentes": int(situ.eq("pendente").sum()),
+        "emissoes": int(len(em)),
+        "interferentes": int(interf.eq("sim").sum()),
+        "atos_ute": int(len(dados["tabela_ute"])),
+        "por_faixa": faixa[faixa != ""].value_counts().to_dict(),
+    }
+
+def _resumo_seguro(client, ev: Dict) -> Optional[Dict]:
+    # Leituras do painel não contam como uso do evento: não despejam os eventos em que as sessões trabalham
+    _contexto_leitura.painel = True
+    try: return calcular_resumo_evento(client, ev["id"], ev["modificado"])
+    except Exception: return None
+    finally: _contexto_leitura.painel = False
+
+# ===================== OCUPAÇÃO ESPECTRAL =====================
+
+def _carregar_painel_frequencias(_client, spreadsheet_id) -> pd.DataFrame:
+    """Todas as linhas do PAINEL (não só pendentes), apenas as colunas usadas no índice espectral"""
+    cab = carregar_cabecalhos_abas(_client, spreadsheet_id).get("PAINEL")
+    if not cab: return pd.DataFrame()
+    linha_cab, header = cab
+    nomes = {
+        "Frequência (MHz)": _first_col_match(header, lambda s: "frequência" in s or "frequencia" in s),
+        "Largura (kHz)": _first_col_match(header, lambda s: "largura" in s),
+        "Local": _first_col_match(header, lambda s: "estação" in s or "estacao" in s),
+        "ID": _first_col_match(header, lambda s: s == "id"),
+        "Situação": _first_col_match(header, lambda s: s == "situação" or s == "situacao"),
+    }
+    if not nomes["Frequência (MHz)"]: return pd.DataFrame()
+
+    planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+    campos = [k for k, v in nomes.items() if v]
+    letras = [_col_letter(header.index(nomes[k]) + 1) for k in campos]
+    resp = planilha.values_batch_get([_intervalo("PAINEL", f"{l}{linha_cab + 1}:{l}") for l in letras]).get("valueRanges", [])
 
-    for nome in abas:
+    colunas = {k: [r[0] if r else "" for r in vr.get("values", [])] for k, vr in zip(campos, resp)}
+    n = max((len(v) for v in colunas.values()), default=0)
+    df = pd.DataFrame({k: v + [""] * (n - len(v)) for k, v in colunas.items()})
+    df["Origem"] = "PAINEL"
+    return df
+
+@_cache_versionado(tipo="espectro")
+def carregar_indice_espectro(_client, spreadsheet_id):
+    """
+    Índice de intervalos de todo o evento (Abordagem, PAINEL, Tabela UTE e estações).
+    Cada registro vira [freq - largura/2, freq + largura/2] em MHz, ordenado pelo início.
+    Retorna (DataFrame ordenado, maior largura em MHz).
+    """
+    partes = []
+    cols = ["Frequência (MHz)", "Largura (kHz)", "Origem", "Local", "ID", "Situação"]
+    try:
+        base = carregar_base_busca(_client, spreadsheet_id)
+        if not base.empty:
+            partes.append(base.rename(columns={"Aba/Origem": "Origem"})[cols])
+
+        painel = _carregar_painel_frequencias(_client, spreadsheet_id)
+        if not painel.empty:
+            partes.append(painel.reindex(columns=cols, fill_value=""))
+
+        ute = carregar_dados_ute(_client, spreadsheet_id)
+        if not ute.empty:
+            partes.append(pd.DataFrame({
+                "Frequência (MHz)": ute["Frequência (MHz)"], "Largura (kHz)": "", "Origem": "Tabela UTE",
+                "Local": ute["Local"], "ID": ute["Processo SEI"], "Situação": "UTE: " + ute["País/Entidade"].astype(str),
+            }))
+    except Exception:
+        pass
+
+    if not partes: return pd.DataFrame(columns=cols + ["inicio", "fim"]), 0.0
+
+    df = pd.concat([p.astype(str) for p in partes], ignore_index=True)
+    df = _compactar_pendencias(df)
+    df = df[df["Frequência (MHz)"].notna()]
+    meia = df["Largura (kHz)"].fillna(0.0).clip(lower=0.0) / 2000.0  # kHz -> MHz, metade para cada lado
+    df = df.assign(inicio=df["Frequência (MHz)"] - meia, fim=df["Frequência (MHz)"] + meia)
+    df = df.sort_values("inicio", kind="stable").reset_index(drop=True)
+    largura_max = float((df["fim"] - df["inicio"]).max()) if not df.empty else 0.0
+    return df, largura_max
+
+def consultar_ocupacao(indice, f_ini: float, f_fim: float) -> pd.DataFrame:
+    """
+    Registros que ocupam algum trecho de [f_ini, f_fim] MHz.
+    Busca binária nos inícios ordenados: só quem começa entre (f_ini - maior largura) e f_fim
+    pode se sobrepor, então o custo é O(log n + k) enquanto as larguras forem comparáveis.
+    """
+    df, largura_max = indice
+    if df.empty: return df
+    inicios = df["inicio"].to_numpy()
+    lo = int(np.searchsorted(inicios, f_ini - largura_max, side="left"))
+    hi = int(np.searchsorted(inicios, f_fim, side="right"))
+    candidatos = df.iloc[lo:hi]
+    return candidatos[candidatos["fim"].to_numpy() >= f_ini]
+
+# Ordem de precedência do aviso, como na varredura antiga: Abordagem, depois UTE, depois estações
+_PRIORIDADE_CONFLITO = {"Abordagem": 0, "Tabela UTE": 1}
+
+@_cache_versionado(tipo="espectro")
+def carregar_registros_conflito(_client, spreadsheet_id) -> pd.DataFrame:
+    """
+    Registros que contam como conflito (Abordagem, Tabela UTE e estações; o PAINEL é espelho), com o rótulo
+    do aviso. Lê só as colunas de frequência/largura (e a entidade da UTE) numa batchGet, então uma
+    gravação não obriga a recarregar o evento inteiro na próxima frequência digitada. A frequência das
+    estações vem de layout["estacao_col_freq"] (ajustável na aba CONFIG); a largura, do cabeçalho.
+    Colunas: "Frequência (MHz)", inicio, fim (MHz), rotulo e prio, ordenadas pelo início.
+    """
+    saida = ["Frequência (MHz)", "inicio", "fim", "rotulo", "prio"]
+    try:
+        layout = carregar_layout_evento(_client, spreadsheet_id)
+        cabecalhos = carregar_cabecalhos_abas(_client, spreadsheet_id)
+        cols = _colunas_abordagem(layout)
+
+        # aba -> (primeira linha de dados, {campo: letra})
+        fontes = {
+            "Abordagem": (2, {"freq": cols["Frequência (MHz)"], "bw": cols["Largura (kHz)"]}),
+            "Tabela UTE": (2, {"freq": layout["ute_col_freq"], "ent": layout["ute_col_entidade"]}),
+        }
+        for nome in listar_abas_estacoes(_client, spreadsheet_id):
+            if nome not in cabecalhos: continue
+            linha_cab, header = cabecalhos[nome]
+            letras = {"freq": layout["estacao_col_freq"]}
+            col_bw = _first_col_match(header, MAPA_COLS_ESTACAO["bw"])
+            if col_bw: letras["bw"] = _col_letter(header.index(col_bw) + 1)
+            fontes[nome] = (linha_cab + 1, letras)
+
+        planilha = abrir_planilha_selecionada(_client, spreadsheet_id)
+        pedidos = [(aba, campo, _intervalo(aba, f"{letra}{ini}:{letra}"))
+                   for aba, (ini, letras) in fontes.items() for campo, letra in letras.items()]
+        colunas = {aba: {} for aba in fontes}
+        for k in range(0, len(pedidos), LOTE_INTERVALOS):
+            lote = pedidos[k:k + LOTE_INTERVALOS]
+            resp = planilha.values_batch_get([p[2] for p in lote]).get("valueRanges", [])
+            for (aba, campo, _), vr in zip(lote, resp):
+                colunas[aba][campo] = [r[0] if r else "" for r in vr.get("values", [])]
+    except Exception:
+        return pd.DataFrame(columns=saida)
+
+    partes = []
+    for aba, dados in colunas.items():
+        n = max((len(v) for v in dados.values()), default=0)
+        if n == 0: continue
+        df = pd.DataFrame({campo: v + [""] * (n - len(v)) for campo, v in dados.items()})
+        if aba == "Tabela UTE":
+            rotulo = "UTE [Entidade: " + df["ent"] + "]"
+        else:
+            rotulo = "Abordagem" if aba == "Abordagem" else f"Estação {aba}"
+        partes.append(pd.DataFrame({
+            "Frequência (MHz)": _para_numero(df["freq"]),
+            "Largura (kHz)": _para_numero(df["bw"]) if "bw" in df.columns else np.nan,
+            "rotulo": rotulo, "prio": _PRIORIDADE_CONFLITO.get(aba, 2),
+        }))
+    if not partes: return pd.DataFrame(columns=saida)
+
+    df = pd.concat(partes, ignore_index=True)
+    df = df[df["Frequência (MHz)"].notna()]
+    meia = df["Largura (kHz)"].fillna(0.0).clip(lower=0.0) / 2000.0  # kHz -> MHz, metade para cada lado
+    df = df.assign(inicio=df["Frequência (MHz)"] - meia, fim=df["Frequência (MHz)"] + meia)
+    return df.sort_values("inicio", kind="stable").reset_index(drop=True)[saida]
+
+@_cache_versionado(tipo="espectro")
+def carregar_frequencias_conhecidas(_client, spreadsheet_id) -> tuple:
+    """
+    Frequências já registradas (Abordagem, Tabela UTE e estações) arredondadas a 3 casas e ordenadas,
+    com o rótulo de onde aparecem. Sai dos registros de conflito em cache: nenhuma leitura extra da planilha.
+    """
+    df = carregar_registros_conflito(_client, spreadsheet_id)
+    if df.empty: return np.array([]), np.array([], dtype=object)
+
+    ordem = pd.DataFrame({
+        "freq": df["Frequência (MHz)"].round(3).to_numpy(),
+        "prio": df["prio"].to_numpy(),
+        "rotulo": df["rotulo"].to_numpy(),
+    }).sort_values(["freq", "prio"], kind="stable")
+    return ordem["freq"].to_numpy(), ordem["rotulo"].to_numpy()
+
+@_cache_versionado(tipo="espectro")
+def carregar_intervalos_conhecidos(_client, spreadsheet_id) -> tuple:
+    """
+    Os mesmos registros como intervalos [início, fim] em MHz, ordenados pelo início (já vêm assim da carga).
+    Retorna (inícios, fins, rótulos, maior largura em MHz) para a checagem de sobreposição em lote.
+    """
+    df = carregar_registros_conflito(_client, spreadsheet_id)
+    if df.empty: return np.array([]), np.array([]), np.array([], dtype=object), 0.0
+    largura_max = float((df["fim"] - df["inicio"]).max())
+    return df["inicio"].to_numpy(), df["fim"].to_numpy(), df["rotulo"].to_numpy(), largura_max
+
+def _onde_constam(freqs: np.ndarray, rotulos: np.ndarray, alvos: np.ndarray) -> np.ndarray:
+    """Rótulo de cada alvo (3 casas) no vetor ordenado de frequências conhecidas, ou None"""
+    if len(freqs) == 0: return np.full(len(alvos), None, dtype=object)
+    i = np.searchsorted(freqs, alvos, side="left")
+    i_ok = np.minimum(i, len(freqs) - 1)
+    return np.where((i < len(freqs)) & (freqs[i_ok] == alvos), rotulos[i_ok], None)
+
+def conflito_frequencia(client, spreadsheet_id, freq_digitada) -> Optional[str]:
+    """Onde a frequência (3 casas) já consta, ou None. Busca binária no vetor em cache."""
+    if not freq_digitada or freq_digitada <= 0: return None
+    freqs, rotulos = carregar_frequencias_conhecidas(client, spreadsheet_id)
+    return _onde_constam(freqs, rotulos, np.array([round(float(freq_digitada), 3)]))[0]
+
+def conflitos_frequencias(client, spreadsheet_id, freqs, larguras=None) -> pd.DataFrame:
+    """
+    Checagem em lote de uma lista de frequências (MHz) com larguras opcionais (kHz).
+    Uma passada vetorizada sobre os vetores em cache, em vez de uma checagem por frequência:
+      - "Consta em": mesma frequência (3 casas) já registrada, como o aviso do campo único;
+      - "Sobreposições": quantos registros conhecidos ocupam algum trecho de [f - largura/2, f + largura/2];
+      - "Repetida na lista": a frequência aparece mais de uma vez na própria lista.
+    """
+    f = np.asarray(freqs, dtype=float)
+    bw = np.zeros(len(f)) if larguras is None else np.nan_to_num(np.asarray(larguras, dtype=float)).clip(min=0.0)
+    arred = np.round(f, 3)
+
+    conhecidas, rotulos = carregar_frequencias_conhecidas(client, spreadsheet_id)
+    consta = _onde_constam(conhecidas, rotulos, arred)
+
+    # Sobreposição: como em consultar_ocupacao, só quem começa entre (início - maior largura) e o fim
+    # pode encostar no intervalo; os candidatos de todas as linhas saem de uma vez com np.repeat
+    inicios, fins, _, largura_max = carregar_intervalos_conhecidos(client, spreadsheet_id)
+    q_ini, q_fim = f - bw / 2000.0, f + bw / 2000.0
+    lo = np.searchsorted(inicios, q_ini - largura_max, side="left")
+    hi = np.searchsorted(inicios, q_fim, side="right")
+    n_cand = hi - lo
+    dono = np.repeat(np.arange(len(f)), n_cand)
+    pos = np.arange(n_cand.sum()) - np.repeat(np.cumsum(n_cand) - n_cand, n_cand) + np.repeat(lo, n_cand)
+    encosta = fins[pos] >= q_ini[dono]
+    sobrepoe = np.bincount(dono[encosta], minlength=len(f))
+
+    return pd.DataFrame({
+        "Frequência (MHz)": f, "Largura (kHz)": bw, "Consta em": consta,
+        "Sobreposições": sobrepoe, "Repetida na lista": pd.Series(arred).duplicated(keep=False).to_numpy(),
+    })
+
+def _ler_lista_frequencias(texto: str) -> tuple:
+    """
+    Coluna colada (uma frequência por linha, opcionalmente seguida da largura em kHz por tab, ';' ou espaço;
+    vírgula decimal aceita). Retorna (DataFrame Linha/Frequência/Largura das válidas, números das linhas inválidas).
+    """
+    linhas = pd.Series(texto.splitlines(), dtype=object).str.strip()
+    linhas = linhas[linhas != ""]
+    if linhas.empty: return pd.DataFrame(columns=["Linha", "Frequência (MHz)", "Largura (kHz)"]), []
+    partes = linhas.str.split(r"[\t; ]+", n=1, regex=True, expand=True).reindex(columns=[0, 1])
+    num = partes.apply(lambda c: pd.to_numeric(c.astype(str).str.replace(",", ".", regex=False).str.strip(), errors="coerce"))
+    df = pd.DataFrame({"Linha": linhas.index + 1, "Frequência (MHz)": num[0].to_numpy(), "Largura (kHz)": num[1].to_numpy()})
+    valido = df["Frequência (MHz)"] > 0
+    return df[valido].reset_index(drop=True), df.loc[~valido, "Linha"].tolist()
+
+# ===================== IMPORTAÇÃO DE ARQUIVOS =====================
+# Logs de receptor (CSV com frequência, largura, data/hora e nível) viram emissões da Abordagem
+IMPORTACAO_LINHAS_POR_LOTE = 5000   # linhas do CSV convertidas por vez
+IMPORTACAO_MAX_EMISSOES = 1000      # teto de linhas gravadas numa importação
+_FATOR_MHZ = {"MHz": 1.0, "kHz": 1e-3, "Hz": 1e-6, "GHz": 1e3}
+_CODIFICACOES_CSV = ("utf-8-sig", "latin-1")
+
+def _separador_csv(arquivo) -> str:
+    """';', tab ou ',' — o que mais aparece na primeira linha"""
+    arquivo.seek(0)
+    primeira = arquivo.read(4096)
+    arquivo.seek(0)
+    if isinstance(primeira, bytes): primeira = primeira.decode("latin-1")
+    primeira = primeira.splitlines()[0] if primeira else ""
+    return max([";", "\t", ","], key=primeira.count)
+
+def colunas_csv(arquivo) -> List[str]:
+    """Só o cabeçalho do CSV (nada além da primeira linha é convertido)"""
+    sep = _separador_csv(arquivo)
+    for cod in _CODIFICACOES_CSV:
         try:
-            aba = planilha.worksheet(nome)
-            all_vals = aba.get_all_values()
-            if not all_vals: continue
-            
-            if nome == "Abordagem":
-                # Recorta apenas o banco de dados real (H a W -> índices 7 a 22)
-                header = all_vals[0][7:23]
-                rows = [r[7:23] for r in all_vals[1:]]
-                df = pd.DataFrame(rows, columns=header)
-                # Padroniza nomes para o buscador
-                df = df.rename(columns={
-                    "Estação": "Local",
-                    "Ocorrência (obsevações)": "Ocorrência (observações)"
-                })
-            else:
-                df = pd.DataFrame(all_vals[1:], columns=all_vals[0])
-                df = df.iloc[:, ~df.columns.duplicated()]
-            
-            df.insert(0, "Aba/Origem", nome)
-            df["Fonte"] = "BUSCA"
-            
-            # Busca em todas as colunas
-            comb = df.fillna("").astype(str).agg(" ".join, axis=1)
-            mask = comb.apply(lambda x: termos_norm in _normalize_text(x))
-            
-            achados = df[mask].copy()
-            if not achados.empty:
-                resultados.append(achados)
-        except: continue
+            arquivo.seek(0)
+            return [str(c).strip() for c in pd.read_csv(arquivo, sep=sep, nrows=0, encoding=cod).columns]
+        except UnicodeDecodeError:
+            continue
+    return []
+
+def _detectar_colunas_csv(colunas: List[str]) -> Dict[str, Optional[str]]:
+    """Sugestão de mapeamento pelos nomes mais comuns nos exports de receptores"""
+    return {
+        "freq": _first_col_match(colunas, lambda s: "freq" in s),
+        "largura": _first_col_match(colunas, lambda s: "larg" in s, lambda s: "bandwidth" in s, lambda s: s in ("bw", "band", "rbw")),
+        "momento": _first_col_match(colunas, lambda s: "timestamp" in s, lambda s: "data" in s, lambda s: "date" in s, lambda s: "time" in s, lambda s: "hora" in s),
+        "nivel": _first_col_match(colunas, lambda s: "nível" in s, lambda s: "nivel" in s, lambda s: "level" in s, lambda s: "dbm" in s, lambda s: "dbµv" in s, lambda s: "dbuv" in s),
+    }
+
+def ler_csv_medicoes(arquivo, mapa: Dict[str, Optional[str]], unidade: str = "MHz") -> pd.DataFrame:
+    """
+    Lê o CSV em lotes de IMPORTACAO_LINHAS_POR_LOTE linhas, só as colunas mapeadas, e converte cada lote
+    na hora (vírgula decimal aceita); do arquivo só ficam em memória quatro colunas numéricas.
+    Retorna "Frequência (MHz)", "Largura (kHz)", "Momento" e "Nível", sem as linhas de frequência inválida.
+    """
+    usadas = {campo: col for campo, col in mapa.items() if col}
+    sep = _separador_csv(arquivo)
+    for cod in _CODIFICACOES_CSV:
+        partes = []
+        try:
+            arquivo.seek(0)
+            lotes = pd.read_csv(arquivo, sep=sep, dtype=str, encoding=cod, skipinitialspace=True, on_bad_lines="skip",
+                                usecols=lambda c: str(c).strip() in usadas.values(), chunksize=IMPORTACAO_LINHAS_POR_LOTE)
+            for lote in lotes:
+                lote.columns = [str(c).strip() for c in lote.columns]
+                vazio = pd.Series(np.nan, index=lote.index)
+                freq = _para_numero(lote[usadas["freq"]]) * _FATOR_MHZ[unidade]
+                partes.append(pd.DataFrame({
+                    "Frequência (MHz)": freq.round(6),
+                    "Largura (kHz)": _para_numero(lote[usadas["largura"]]) if "largura" in usadas else vazio,
+                    "Momento": _para_momento(lote[usadas["momento"]].str.strip())
+                               if "momento" in usadas else pd.Series(pd.NaT, index=lote.index),
+                    "Nível": _para_numero(lote[usadas["nivel"]]) if "nivel" in usadas else vazio,
+                })[freq > 0])
+            break
+        except UnicodeDecodeError:
+            continue
+    if not partes: return pd.DataFrame(columns=["Frequência (MHz)", "Largura (kHz)", "Momento", "Nível"])
+    return pd.concat(partes, ignore_index=True)
+
+def preparar_importacao(medidas: pd.DataFrame, padroes: Dict, agrupar: bool) -> pd.DataFrame:
+    """
+    Medidas -> linhas no formato do bloco da Abordagem (COLS_ABORDAGEM_HW sem o ID), completando com os
+    valores comuns do formulário. Com `agrupar`, leituras repetidas da mesma frequência (3 casas) viram
+    uma emissão: primeiro horário, maior largura e maior nível.
+    """
+    if agrupar and not medidas.empty:
+        medidas = (medidas.assign(_f=medidas["Frequência (MHz)"].round(3))
+                   .groupby("_f", sort=False)
+                   .agg({"Frequência (MHz)": "first", "Largura (kHz)": "max", "Momento": "min", "Nível": "max"})
+                   .reset_index(drop=True))
+
+    momento = medidas["Momento"]
+    nivel = medidas["Nível"].map(lambda v: "" if pd.isna(v) else f" - Nível: {_fmt_num(v)}").astype(str)
+    return pd.DataFrame({
+        "Local": padroes["Local"], "Fiscal": padroes["Fiscal"],
+        "Data": momento.dt.strftime("%d/%m/%Y").fillna(padroes["Dia"].strftime("%d/%m/%Y")),
+        "HH:mm": momento.dt.strftime("%H:%M").fillna(padroes["Hora"].strftime("%H:%M")),
+        "Frequência (MHz)": medidas["Frequência (MHz)"],
+        "Largura (kHz)": medidas["Largura (kHz)"].fillna(padroes["Largura"] or 0.0),
+        "Faixa de Frequência Envolvida": padroes["Faixa"] or "", "Identificação": padroes["Identificação"] or "",
+        "Autorizado?": "Indefinido", "UTE?": "Não", "Processo SEI UTE": "",
+        "Ocorrência (observações)": padroes["Observações"] + nivel, "Alguém mais ciente?": "",
+        "Interferente?": padroes["Interferente"] or "", "Situação": padroes["Situação"],
+    }, index=medidas.index).reset_index(drop=True)
+
+@st.fragment
+def render_importacao_csv(client, spread_id):
+    """Upload do CSV do receptor, mapeamento de colunas, prévia com conflitos e gravação em lote"""
+    with st.expander("📥 Importar emissões de arquivo (CSV do receptor)", expanded="importacao_previa" in st.session_state):
+        if st.session_state.get("importacao_ok"):
+            st.success(st.session_state.importacao_ok)
+        arquivo = st.file_uploader("Arquivo CSV", type=["csv", "txt"], key="importacao_arquivo")
+        if arquivo is None:
+            st.session_state.pop("importacao_previa", None)
+            return
+
+        colunas = colunas_csv(arquivo)
+        if not colunas:
+            st.error("Não foi possível ler o cabeçalho do arquivo.")
+            return
+        sugestao = _detectar_colunas_csv(colunas)
+        opcoes = ["(nenhuma)"] + colunas
+
+        def _coluna(rotulo, campo, c):
+            col = c.selectbox(rotulo, opcoes, index=opcoes.index(sugestao[campo]) if sugestao[campo] else 0, key=f"importacao_{campo}")
+            return None if col == "(nenhuma)" else col
+
+        c1, c2 = st.columns(2)
+        mapa = {"freq": _coluna(f"Coluna da frequência {OBRIG}", "freq", c1), "largura": _coluna("Coluna da largura (kHz)", "largura", c2),
+                "momento": _coluna("Coluna de data/hora", "momento", c1), "nivel": _coluna("Coluna do nível", "nivel", c2)}
+        unidade = c1.selectbox("Unidade da frequência no arquivo", list(_FATOR_MHZ), key="importacao_unidade")
+        agrupar = c2.checkbox("Juntar leituras repetidas da mesma frequência", value=True, key="importacao_agrupar")
+        if not mapa["freq"]:
+            st.warning("Escolha a coluna da frequência.")
+            return
 
-    if not resultados: return pd.DataFrame()
-    return pd.concat(resultados, ignore_index=True)
+        # Conversão do arquivo só quando arquivo, mapeamento ou unidade mudam
+        chave = (arquivo.file_id, tuple(mapa.items()), unidade)
+        if st.session_state.get("importacao_medidas", (None,))[0] != chave:
+            st.session_state.importacao_medidas = (chave, ler_csv_medicoes(arquivo, mapa, unidade))
+        medidas = st.session_state.importacao_medidas[1]
+        st.caption(f"{len(medidas)} leituras válidas no arquivo.")
+
+        with st.form("form_importacao", border=False):
+            fuso = ZoneInfo(obter_fuso_horario_evento(client, spread_id))
+            c1, c2 = st.columns(2)
+            fiscal = c1.text_input(f"Fiscal {OBRIG}")
+            local = c2.text_input("Local/Região", value="Abordagem")
+            dia = c1.date_input("Data (linhas sem data/hora)", value=datetime.now(fuso).date(), format="DD/MM/YYYY")
+            hora = c2.time_input("Hora (linhas sem data/hora)", value=datetime.now(fuso).time())
+            largura = c1.number_input("Largura (kHz) das linhas sem largura", value=None, format="%.1f")
+            faixa = c2.selectbox("Faixa relacionada", FAIXA_OPCOES, index=None, placeholder="Selecione...")
+            ident = c1.selectbox("Identificação", carregar_opcoes_identificacao(client, spread_id), index=None, placeholder="Selecione...")
+            interferente = c2.selectbox("Interferente?", ["Sim", "Não", "Indefinido"], index=2)
+            situacao = c1.selectbox(f"Status {OBRIG}", ["Pendente", "Concluído"], index=0)
+            pular = c2.checkbox("Não importar frequências que já constam na planilha", value=True)
+            obs = st.text_input("Observações (vão para todas as linhas)", value="Importado de log de receptor")
+
+            if st.form_submit_button("Pré-visualizar", use_container_width=True):
+                st.session_state.pop("importacao_ok", None)
+                if not fiscal:
+                    st.error("Preencha o Fiscal.")
+                else:
+                    padroes = {"Local": local, "Fiscal": fiscal, "Dia": dia, "Hora": hora, "Largura": largura,
+                               "Faixa": faixa, "Identificação": ident, "Interferente": interferente,
+                               "Situação": situacao, "Observações": obs}
+                    linhas = preparar_importacao(medidas, padroes, agrupar)
+                    # Uma checagem vetorizada para o arquivo todo (mesma do "Verificar lista")
+                    conflitos = conflitos_frequencias(client, spread_id, linhas["Frequência (MHz)"], linhas["Largura (kHz)"])
+                    linhas = linhas.assign(**{c: conflitos[c].to_numpy() for c in ("Consta em", "Sobreposições")})
+                    if pular: linhas = linhas[linhas["Consta em"].isna()].reset_index(drop=True)
+                    st.session_state.importacao_previa = linhas
+
+        linhas = st.session_state.get("importacao_previa")
+        if linhas is None: return
+        st.caption(f"{len(linhas)} emissões a importar | já constam: {int(linhas['Consta em'].notna().sum())} | "
+                   f"com sobreposição: {int((linhas['Sobreposições'] > 0).sum())}")
+        st.dataframe(linhas[["Data", "HH:mm", "Frequência (MHz)", "Largura (kHz)", "Ocorrência (observações)", "Consta em", "Sobreposições"]],
+                     hide_index=True, use_container_width=True,
+                     column_config={"Frequência (MHz)": st.column_config.NumberColumn(format="%.4f")})
+        if len(linhas) > IMPORTACAO_MAX_EMISSOES:
+            st.error(f"Mais de {IMPORTACAO_MAX_EMISSOES} emissões: junte as leituras repetidas ou divida o arquivo.")
+        elif len(linhas) and st.button(f"Importar {len(linhas)} emissões", use_container_width=True, key="btn_importar"):
+            res = inserir_emissoes_em_lote(client, spread_id, linhas)
+            if res.startswith("ERRO"):
+                st.error(res)
+            else:
+                for key in ["importacao_previa", "importacao_medidas"]: st.session_state.pop(key, None)
+                st.session_state.importacao_ok = res
+                st.rerun(scope="fragment")
 
 def render_ocorrencia_readonly(row: pd.Series, key_prefix: str):
     """Renderiza os dados de uma linha de forma organizada com todos os campos solicitados"""
@@ -1068,10 +2549,10 @@ def render_ocorrencia_readonly(row: pd.Series, key_prefix: str):
         st.text_input("Fiscal", value=str(row.get("Fiscal", "")), disabled=True, key=f"{key_prefix}_fisc")
         st.text_input("Data da identificação", value=str(data_val), disabled=True, key=f"{key_prefix}_dt")
         st.text_input("Hora (HH:mm)", value=str(hora_val), disabled=True, key=f"{key_prefix}_hr")
-        st.text_input("Frequência (MHz)", value=str(freq_val), disabled=True, key=f"{key_prefix}_frq")
+        st.text_input("Frequência (MHz)", value=_fmt_num(freq_val), disabled=True, key=f"{key_prefix}_frq")
 
     with c2:
-        st.text_input("Largura (kHz)", value=str(bw_val), disabled=True, key=f"{key_prefix}_bw")
+        st.text_input("Largura (kHz)", value=_fmt_num(bw_val), disabled=True, key=f"{key_prefix}_bw")
         st.text_input("Faixa de Frequência", value=str(row.get("Faixa de Frequência Envolvida", "")), disabled=True, key=f"{key_prefix}_faixa")
         st.text_input("Identificação", value=str(row.get("Identificação", "")), disabled=True, key=f"{key_prefix}_ident")
         st.text_input("Autorizado?", value=str(row.get("Autorizado?", "")), disabled=True, key=f"{key_prefix}_autz")
@@ -1082,6 +2563,22 @@ def render_ocorrencia_readonly(row: pd.Series, key_prefix: str):
     st.text_area("Ocorrência (observações)", value=str(row.get("Ocorrência (observações)", row.get("Ocorrência (obsevações)", ""))), disabled=True, key=f"{key_prefix}_obs")
     st.caption(f"Fonte: {row.get('Fonte', 'N/A')} | Aba Origem: {row.get('Aba/Origem', 'N/A')}")
 
+# ===================== PRÉ-CARGA =====================
+
+@st.cache_resource(show_spinner=False)
+def _aquecer_processo():
+    """Uma vez por processo, logo após o boot: carrega no pool o que as telas seguintes vão usar"""
+    _submeter(lambda: pd.DataFrame)
+    _submeter(lambda: np.ndarray)
+    _submeter(_grade_fusos)
+    return True
+
+def _aquecer_caches_evento(client, spreadsheet_id):
+    """Dispara em segundo plano as cargas das telas seguintes ao menu (inserir, busca, UTE)"""
+    for fn in (carregar_opcoes_identificacao, obter_fuso_horario_evento, carregar_base_busca, carregar_dados_ute,
+               carregar_frequencias_conhecidas, carregar_intervalos_conhecidos):
+        _submeter(fn, client, spreadsheet_id)
+
 # ========================= TELAS =========================
 
 def botao_voltar(label="⬅️ Voltar ao Menu", key=None):
@@ -1138,6 +2635,8 @@ def tela_selecao_evento(client):
                 st.session_state['evento_nome'] = selecao
                 st.session_state['spreadsheet_id'] = eventos_dict[selecao]
                 st.session_state['view'] = 'main_menu'
+                # Enquanto o usuário lê o menu, as próximas telas já vão sendo carregadas
+                _aquecer_caches_evento(client, eventos_dict[selecao])
                 # O Streamlit fará o rerun automaticamente após este callback
 
         # O selectbox agora tem uma 'key' e um 'on_change'
@@ -1152,28 +2651,72 @@ def tela_selecao_evento(client):
         
         # NOTA: O bloco 'if escolha:' antigo foi removido, pois o 'on_change' cuida de tudo.
 
+        if st.button("📊 Painel consolidado dos eventos", use_container_width=True, key="btn_painel_eventos"):
+            st.session_state.view = 'painel_eventos'; st.rerun()
+
 def tela_menu_principal(client, spread_id):
     render_header(show_logout=True)
 
-    # --- LOADING ÚNICO E LIMPO ---
-    # Tudo que estiver dentro do 'with st.spinner' será carregado enquanto mostra apenas uma msg
-    with st.spinner("Carregando base de dados..."):
-        df_painel = carregar_pendencias_painel_mapeadas(client, spread_id)
-        df_abord  = carregar_pendencias_abordagem_pendentes(client, spread_id)
-        df_estac  = carregar_pendencias_todas_estacoes(client, spread_id)
-        
-        # URL Dinâmica do Mapa (também consome tempo)
-        link_mapa = get_city_map_url(client, spread_id)
-    
-    # Cálculos rápidos (não precisa de spinner)
-    count_painel = len(df_painel) if df_painel is not None else 0
-    count_abord = len(df_abord) if df_abord is not None else 0
-    count_estac = len(df_estac) if df_estac is not None else 0
-    total = count_painel + count_abord + count_estac
+    # --- CARGA CONCORRENTE ---
+    # A contagem de pendências (que já carrega as três fontes) e a URL do mapa saem no pool; nada aqui espera por elas
+    urls_mapa = st.session_state.setdefault('mapa_url', {})
+    futuro_mapa = None if spread_id in urls_mapa else _submeter(get_city_map_url, client, spread_id)
+    placar_inicial, _ = _placar_atual(client, spread_id)
+
+    # --- CONTADOR AO VIVO ---
+    # Só este trecho roda a cada PLACAR_INTERVALO_S: lê o placar do processo (sem ir à planilha por sessão).
+    # Na primeira contagem do evento consulta mais amiúde e, quando ela sai, redesenha a tela uma vez
+    @st.fragment(run_every=2 if placar_inicial is None else PLACAR_INTERVALO_S)
+    def _botao_tratar():
+        registro, _ = _placar_atual(client, spread_id)
+        if registro is not None and placar_inicial is None:
+            st.rerun()
+        if registro is None:
+            st.button("**📝 TRATAR** emissões pendentes (…)", use_container_width=True, disabled=True, key="btn_consultar_0")
+            return
+
+        vistos = st.session_state.setdefault('placar_visto', {})
+        if vistos.get(spread_id, registro["seq"]) < registro["seq"] and registro["novas"]:
+            st.toast(f"🔔 {registro['novas']} nova(s) pendência(s) no evento")
+        vistos[spread_id] = registro["seq"]
+
+        # Registros repetidos do mesmo emissor contam uma vez no segundo número
+        contagem = str(registro["total"])
+        if registro.get("grupos", registro["total"]) < registro["total"]: contagem += f" em {registro['grupos']} grupos"
+        if st.button(f"**📝 TRATAR** emissões pendentes ({contagem})", use_container_width=True, key="btn_consultar"):
+            st.session_state.view = 'consultar'; st.rerun()
+
+    # --- ONDE AS PENDÊNCIAS SE ACUMULAM ---
+    # Lê o resumo já materializado no placar (atualizado a cada recontagem), sem reagrupar as pendências
+    @st.fragment(run_every=PLACAR_INTERVALO_S)
+    def _resumo_pendencias():
+        registro, _ = _placar_atual(client, spread_id)
+        if not registro or not registro["resumo"]: return
+        with st.expander("📊 Onde estão as pendências"):
+            dimensao = st.radio("Agrupar por", ["Estação", "Faixa", "Fiscal"], horizontal=True, key="resumo_dimensao")
+            hoje = datetime.now(ZoneInfo(obter_fuso_horario_evento(client, spread_id))).date()
+            tabela = tabela_resumo_pendencias(registro["resumo"], dimensao, hoje)
+            st.dataframe(tabela, use_container_width=True, column_config={
+                "Total": st.column_config.ProgressColumn("Total", format="%d", min_value=0, max_value=int(tabela["Total"].max())),
+            })
+
+    # --- LINK DO MAPA ---
+    # Enquanto a URL não chega, o botão aponta para o Google Maps genérico e só este trecho se redesenha;
+    # quando chega, fica na sessão e um único rerun desliga a consulta periódica
+    def _guardar_mapa() -> bool:
+        if futuro_mapa is None or not futuro_mapa.done(): return False
+        urls_mapa[spread_id] = futuro_mapa.result() if futuro_mapa.exception() is None else "https://www.google.com/maps"
+        return True
+    if _guardar_mapa(): futuro_mapa = None
+
+    @st.fragment(run_every=None if futuro_mapa is None else 2)
+    def _link_mapa():
+        if _guardar_mapa(): st.rerun()
+        url = urls_mapa.get(spread_id, "https://www.google.com/maps")
+        st.link_button("🗺️ **Mapa da Região/Evento**", url, use_container_width=True)
 
-    label_tratar = f"**📝 TRATAR** emissões pendentes ({total})"
-    
     # --- LAYOUT DOS BOTÕES ---
+    # Os botões aparecem imediatamente; contagem e mapa são preenchidos conforme chegam
     _, button_col, _ = st.columns([1, 2, 1])
     
     with button_col:
@@ -1182,8 +2725,7 @@ def tela_menu_principal(client, spread_id):
         if st.button("**📋 INSERIR** emissão verificada em campo", use_container_width=True, key="btn_inserir"):
             st.session_state.view = 'inserir'; st.rerun()
             
-        if st.button(label_tratar, use_container_width=True, key="btn_consultar"):
-            st.session_state.view = 'consultar'; st.rerun()
+        _botao_tratar()
             
         if st.button("**📵 REGISTRAR** Jammer ou ERB Fake", use_container_width=True, key="btn_bsr"):
             st.session_state.view = 'bsr_erb'; st.rerun()
@@ -1193,30 +2735,51 @@ def tela_menu_principal(client, spread_id):
             
         if st.button("🗒️ **CONSULTAR** Atos de UTE", use_container_width=True, key="btn_ute"):
             st.session_state.view = 'tabela_ute'; st.rerun()
+            
+        if st.button("📡 **OCUPAÇÃO** espectral do evento", use_container_width=True, key="btn_espectro"):
+            st.session_state.view = 'espectro'; st.rerun()
+            
+        if st.button("📦 **EXPORTAR** dados do evento", use_container_width=True, key="btn_exportar"):
+            st.session_state.view = 'exportar'; st.rerun()
         
-        # ... dentro da função tela_menu_principal, na seção de Botões de Links:
-        st.link_button("🗺️ **Mapa da Região/Evento**", link_mapa, use_container_width=True)
+        _link_mapa()
         st.link_button("🌍 **Tradutor de Texto/Voz**", "https://translate.google.com/?sl=auto&tl=pt&op=translate", use_container_width=True)
 
+        _resumo_pendencias()
+
 def tela_consultar(client, spread_id):
     render_header()
     st.markdown('<div class="info-green">Consulte as emissões pendentes de identificação.</div>', unsafe_allow_html=True)
 
-    df_p = carregar_pendencias_painel_mapeadas(client, spread_id)
-    df_a = carregar_pendencias_abordagem_pendentes(client, spread_id)
-    df_e = carregar_pendencias_todas_estacoes(client, spread_id)
-    
-    # Concatena tudo
-    dfs = [d for d in [df_p, df_a, df_e] if not d.empty]
-    df_pend = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    # Base única já concatenada, compactada e agrupada no cache
+    df_pend = carregar_pendencias_agrupadas(client, spread_id)
 
     if not df_pend.empty:
-        opcoes = [f"{r['Local']} | {r['Data']} | {r['Frequência (MHz)']} MHz | {r.get('Ocorrência (observações)','')} | {r['ID']}" for _, r in df_pend.iterrows()]
-        selecionado = st.selectbox("Selecione a emissão:", options=opcoes, index=None, placeholder="Escolha uma pendência...")
+        repetidos = df_pend["Registros no grupo"].to_numpy() > 1
+        if repetidos.any():
+            render_resolver_grupo(client, spread_id, df_pend[repetidos])
+
+        opcoes = (
+            df_pend["Local"].astype(str) + " | " + df_pend["Data"].astype(str) + " | "
+            + df_pend["Frequência (MHz)"].map(_fmt_num) + " MHz | "
+            + df_pend["Ocorrência (observações)"].astype(str) + " | " + df_pend["ID"].astype(str)
+            + np.where(repetidos, " | " + df_pend["Grupo"].astype(str), "")
+        ).tolist()
+        selecionado = st.selectbox("Selecione a emissão:", options=opcoes, index=None, placeholder="Escolha uma pendência...",
+                                   on_change=lambda: st.session_state.pop('consulta_aberta', None))
 
         if selecionado:
             idx = opcoes.index(selecionado)
             reg = df_pend.iloc[idx]
+
+            # Valores do registro no momento em que foi aberto: a gravação compara com eles (edição otimista).
+            # Reabrir (nova seleção) ou receber a carga nova da planilha recomeça dos valores exibidos no formulário.
+            chave_reg = f"{reg['EstacaoRaw']}|{reg['ID']}"
+            carregados = {c: str(reg.get(c, "")) for c in CAMPOS_EDITAVEIS}
+            aberta = st.session_state.get('consulta_aberta', {})
+            if aberta.get("chave") != chave_reg or aberta.get("carregados") != carregados:
+                st.session_state.consulta_aberta = {"chave": chave_reg, "carregados": carregados, "originais": carregados}
+            originais = st.session_state.consulta_aberta["originais"]
             
             st.markdown("#### Editar ocorrência")
             with st.form("form_editar_pendente"):
@@ -1229,8 +2792,8 @@ def tela_consultar(client, spread_id):
                     st.text_input("Fiscal", value=str(reg.get("Fiscal","")), disabled=True)
                     st.text_input("Data da identificação", value=str(reg.get("Data","")), disabled=True)
                     st.text_input("HH:mm", value=str(reg.get("HH:mm","") or reg.get("Hora","")), disabled=True)
-                    st.text_input("Frequência (MHz)", value=str(reg.get("Frequência (MHz)","")), disabled=True)
-                    st.text_input("Largura (kHz)", value=str(reg.get("Largura (kHz)","")), disabled=True)
+                    st.text_input("Frequência (MHz)", value=_fmt_num(reg.get("Frequência (MHz)")), disabled=True)
+                    st.text_input("Largura (kHz)", value=_fmt_num(reg.get("Largura (kHz)")), disabled=True)
                     st.text_input("Faixa de Frequência Envolvida", value=str(reg.get("Faixa de Frequência Envolvida","")), disabled=True)
 
                 # Coluna DIREITA (Edição)
@@ -1273,16 +2836,68 @@ def tela_consultar(client, spread_id):
                         }
                         # PAINEL ou ESTACAO usam a mesma lógica de atualização
                         if reg["Fonte"] == "PAINEL" or reg["Fonte"] == "ESTACAO":
-                            res = atualizar_campos_na_aba_mae(client, spread_id, str(reg["EstacaoRaw"]), str(reg["ID"]), pac)
+                            res = atualizar_campos_na_aba_mae(client, spread_id, str(reg["EstacaoRaw"]), str(reg["ID"]), pac, originais)
                         else:
-                            res = atualizar_campos_abordagem_por_id(client, spread_id, str(reg["ID"]), pac)
+                            res = atualizar_campos_abordagem_por_id(client, spread_id, str(reg["ID"]), pac, originais)
                         
-                        st.success(res)
+                        # Com ou sem sucesso, a próxima tentativa parte dos valores atuais: no erro (conflito), a versão
+                        # é reconsultada para o registro recarregar com o que o outro usuário gravou
+                        st.session_state.pop('consulta_aberta', None)
+                        if res.startswith("ERRO"):
+                            _invalidar_versao(client, spread_id)
+                            st.error(res)
+                        else:
+                            st.success(res)
     else:
         st.success("✔️ Nenhuma pendência encontrada.")
 
     if botao_voltar(): st.session_state.view = 'main_menu'; st.rerun()
 
+def _periodo_datas(datas: pd.Series) -> str:
+    """'dd/mm/aaaa' ou 'dd/mm/aaaa a dd/mm/aaaa' (datas no formato da planilha)"""
+    d = pd.to_datetime(datas.astype(str), format="%d/%m/%Y", errors="coerce").dropna()
+    if d.empty: return "sem data"
+    ini, fim = d.min().strftime("%d/%m/%Y"), d.max().strftime("%d/%m/%Y")
+    return ini if ini == fim else f"{ini} a {fim}"
+
+def render_resolver_grupo(client, spread_id, repetidos: pd.DataFrame):
+    """Resolve de uma vez todos os registros de um grupo de repetidos (mesmo emissor em várias estações)"""
+    n_grupos = repetidos["Grupo"].nunique()
+    with st.expander(f"🧩 Registros repetidos: {len(repetidos)} pendências em {n_grupos} grupos"):
+        resumo = repetidos.groupby("Grupo", observed=True).agg(
+            freq=("Frequência (MHz)", "median"), n=("ID", "size"),
+            locais=("Local", lambda s: ", ".join(sorted(set(map(str, s))))),
+            datas=("Data", _periodo_datas),
+        )
+        rotulos = {g: f"{g} | {_fmt_num(r.freq)} MHz | {r.n} registros | {r.locais} | {r.datas}" for g, r in resumo.iterrows()}
+        grupo = st.selectbox("Grupo:", options=list(rotulos), format_func=rotulos.get, index=None,
+                             placeholder="Escolha um grupo...", key="grupo_sel")
+        if not grupo: return
+
+        membros = repetidos[repetidos["Grupo"] == grupo]
+        st.dataframe(
+            membros[["ID", "Local", "Data", "HH:mm", "Frequência (MHz)", "Largura (kHz)", "Identificação", "Ocorrência (observações)"]],
+            hide_index=True, use_container_width=True,
+            column_config={"Frequência (MHz)": st.column_config.NumberColumn(format="%.4f")},
+        )
+
+        with st.form("form_resolver_grupo"):
+            st.caption("Campos deixados em branco ficam como estão em cada registro.")
+            c1, c2 = st.columns(2)
+            ident = c1.selectbox("Identificação", IDENT_OPCOES, index=None, placeholder="Manter")
+            autz = c2.selectbox("Autorizado?", ["Sim", "Não", "Não licenciável"], index=None, placeholder="Manter")
+            interf = c1.selectbox("Interferente?", ["Sim", "Não", "Indefinido"], index=None, placeholder="Manter")
+            situ = c2.selectbox(f"Situação {OBRIG}", ["Pendente", "Concluído"], index=1)
+
+            if st.form_submit_button(f"Resolver grupo ({len(membros)} registros)", use_container_width=True):
+                pac = {k: v for k, v in {"Identificação": ident, "Autorizado?": autz, "Interferente?": interf, "Situação": situ}.items() if v}
+                res = atualizar_grupo(client, spread_id, membros, pac)
+                if res.startswith("ERRO"):
+                    st.error(res)
+                else:
+                    st.session_state.pop('consulta_aberta', None)
+                    st.success(res)
+
 def tela_inserir(client, spread_id):
     render_header()
 
@@ -1293,7 +2908,7 @@ def tela_inserir(client, spread_id):
     div[data-testid="stNumberInput"] button { display: none !important; }
     
     /* Estiliza o botão de Registrar (Azul Gradiente) */
-    .stButton > button {
+    .stButton > button, .stFormSubmitButton > button {
         background: linear-gradient(to bottom, #14337b, #4464A7) !important;
         border: 3.4px solid #54515c !important;
         border-radius: 8px !important;
@@ -1304,7 +2919,7 @@ def tela_inserir(client, spread_id):
     }
     
     /* Efeito Hover Verde */
-    .stButton > button:hover {
+    .stButton > button:hover, .stFormSubmitButton > button:hover {
         background: linear-gradient(to bottom, #9ccc65, #AED581) !important;
         border-color: #7cb342 !important;
         color: white !important;
@@ -1314,14 +2929,8 @@ def tela_inserir(client, spread_id):
 
     # --- LÓGICA DE CALLBACK ---
     def check_freq_callback():
-        # Buscamos o valor diretamente do estado da widget
-        f_digitada = st.session_state.freq_input_key
-        # Verifica se f_digitada não é None antes de comparar
-        if f_digitada is not None and f_digitada > 0:
-            # Força a execução da busca global
-            st.session_state.aba_conflito = verificar_frequencia_global(client, spread_id, f_digitada)
-        else:
-            st.session_state.aba_conflito = None
+        # Buscamos o valor diretamente do estado da widget; a checagem é uma busca no vetor em cache
+        st.session_state.aba_conflito = conflito_frequencia(client, spread_id, st.session_state.freq_input_key)
         # Limpa mensagem de sucesso anterior
         st.session_state.insert_success = None
 
@@ -1332,34 +2941,16 @@ def tela_inserir(client, spread_id):
     idents = carregar_opcoes_identificacao(client, spread_id)
     dados_prev = st.session_state.get('dados_para_salvar', {})
 
-    # --- CONTAINER NATIVO COM BORDA ---
-    with st.container(border=True):
-        col1, col2 = st.columns(2)
-        
-        # --- BUSCA O FUSO HORÁRIO DINÂMICO ---
-        fuso_evento = obter_fuso_horario_evento(client, spread_id)
-        
-        # Puxa a data/hora já no fuso correto do evento
-        val_dia = dados_prev.get('Dia', datetime.now(ZoneInfo(fuso_evento)).date())
-        val_hora = dados_prev.get('Hora', datetime.now(ZoneInfo(fuso_evento)).time())
-        
-        dia = col1.date_input(f"Data {OBRIG}", value=val_dia, format="DD/MM/YYYY")
-        hora = col2.time_input(f"Hora {OBRIG}", value=val_hora)
-        
-        fiscal = st.text_input(f"Fiscal {OBRIG}", value=dados_prev.get('Fiscal', ''))
-        local = st.text_input("Local/Região", value=dados_prev.get('Local/Região', ''))
-        
-        c3, c4 = st.columns(2)
-        
-        # Pega valores prévios se existirem, senão usa None para deixar vazio
+    # --- FREQUÊNCIA + AVISO: FRAGMENTO PRÓPRIO ---
+    # Digitar a frequência reexecuta só este trecho (não o cabeçalho, o CSS nem o formulário)
+    @st.fragment
+    def _campo_frequencia():
+        # Pega valor prévio se existir, senão usa None para deixar vazio
         val_freq = dados_prev.get('Frequência em MHz')
         val_freq = float(val_freq) if val_freq else None
         
-        val_larg = dados_prev.get('Largura em kHz')
-        val_larg = float(val_larg) if val_larg else None
-        
         # AQUI SÓ PODE EXISTIR UM "key='freq_input_key'" EM TODO O CÓDIGO
-        freq = c3.number_input(
+        st.number_input(
             f"Frequência (MHz) {OBRIG}", 
             value=val_freq, 
             format="%.3f",
@@ -1367,12 +2958,6 @@ def tela_inserir(client, spread_id):
             on_change=check_freq_callback
         )
         
-        larg = c4.number_input(
-            f"Largura (kHz) {OBRIG}", 
-            value=val_larg, 
-            format="%.1f"
-        )
-        
         # Popup Vermelho Médio
         if st.session_state.aba_conflito:
             st.markdown(
@@ -1383,46 +2968,108 @@ def tela_inserir(client, spread_id):
                 </div>
                 """, unsafe_allow_html=True)
 
-        faixa = st.selectbox(f"Faixa relacionada {OBRIG}", FAIXA_OPCOES, index=None, placeholder="Selecione...")
-        ident = st.selectbox(f"Identificação {OBRIG}", idents, index=None, placeholder="Selecione...")
-        interferente = st.selectbox(f"Interferente? {OBRIG}", ["Sim", "Não", "Indefinido"], index=None, placeholder="Selecione...")
-        
-        ute = st.checkbox("UTE?", value=dados_prev.get('UTE?', False))
-        proc = st.text_input("Processo SEI ou Ato UTE", value=dados_prev.get('Processo SEI ou Ato UTE', ''))
-        obs = st.text_area(f"Entidade Resp./Contato/Observações {OBRIG}", value=dados_prev.get('Observações/Detalhes/Contatos', ''))
-        
-        situacao = st.selectbox(f"Status desta emissão {OBRIG}", ["Pendente", "Concluído"], index=None, placeholder="Selecione o status")
+    # --- CONTAINER NATIVO COM BORDA ---
+    with st.container(border=True):
+        _campo_frequencia()
 
-        # Mensagem de sucesso persistente
-        if st.session_state.insert_success:
-            st.success(st.session_state.insert_success)
+        # Demais campos num formulário: nada é reexecutado até o envio
+        with st.form("form_inserir", border=False):
+            col1, col2 = st.columns(2)
+            
+            # --- BUSCA O FUSO HORÁRIO DINÂMICO ---
+            fuso_evento = obter_fuso_horario_evento(client, spread_id)
+            
+            # Puxa a data/hora já no fuso correto do evento
+            val_dia = dados_prev.get('Dia', datetime.now(ZoneInfo(fuso_evento)).date())
+            val_hora = dados_prev.get('Hora', datetime.now(ZoneInfo(fuso_evento)).time())
+            
+            dia = col1.date_input(f"Data {OBRIG}", value=val_dia, format="DD/MM/YYYY")
+            hora = col2.time_input(f"Hora {OBRIG}", value=val_hora)
+            
+            fiscal = st.text_input(f"Fiscal {OBRIG}", value=dados_prev.get('Fiscal', ''))
+            local = st.text_input("Local/Região", value=dados_prev.get('Local/Região', ''))
+            
+            val_larg = dados_prev.get('Largura em kHz')
+            val_larg = float(val_larg) if val_larg else None
+            
+            larg = st.number_input(
+                f"Largura (kHz) {OBRIG}", 
+                value=val_larg, 
+                format="%.1f"
+            )
 
-        if st.button("Registrar Emissão", use_container_width=True):
-            erros = []
-            if not fiscal: erros.append("Fiscal")
-            if not freq or freq <= 0: erros.append("Frequência")
-            if not situacao: erros.append("Status")
+            faixa = st.selectbox(f"Faixa relacionada {OBRIG}", FAIXA_OPCOES, index=None, placeholder="Selecione...")
+            ident = st.selectbox(f"Identificação {OBRIG}", idents, index=None, placeholder="Selecione...")
+            interferente = st.selectbox(f"Interferente? {OBRIG}", ["Sim", "Não", "Indefinido"], index=None, placeholder="Selecione...")
             
-            if erros: 
-                st.error("Preencha os campos obrigatórios.")
-                st.session_state.insert_success = None
-            else:
-                dados_submit = {
-                    'Dia': dia, 'Hora': hora, 'Fiscal': fiscal, 'Local/Região': local,
-                    'Frequência em MHz': freq, 
-                    'Largura em kHz': larg if larg is not None else 0.0, # Evita erro se larg for vazio
-                    'Faixa de Frequência': faixa,
-                    'Identificação': ident, 'UTE?': ute, 'Processo SEI ou Ato UTE': proc,
-                    'Observações/Detalhes/Contatos': obs, 'Situação': situacao,
-                    'Autorizado? (Q)': 'Indefinido', 'Interferente?': interferente
-                }
-                if inserir_emissao_I_W(client, spread_id, dados_submit):
-                    st.session_state.insert_success = "Emissão inserida com sucesso. Caso queira continuar inserindo emissões desta entidade, basta alterar os dados específicos e clicar em Registrar Emissão."
-                    st.session_state.aba_conflito = None
-                    st.rerun()
+            ute = st.checkbox("UTE?", value=dados_prev.get('UTE?', False))
+            proc = st.text_input("Processo SEI ou Ato UTE", value=dados_prev.get('Processo SEI ou Ato UTE', ''))
+            obs = st.text_area(f"Entidade Resp./Contato/Observações {OBRIG}", value=dados_prev.get('Observações/Detalhes/Contatos', ''))
+            
+            situacao = st.selectbox(f"Status desta emissão {OBRIG}", ["Pendente", "Concluído"], index=None, placeholder="Selecione o status")
+
+            # Mensagem de sucesso persistente
+            if st.session_state.insert_success:
+                st.success(st.session_state.insert_success)
+
+            if st.form_submit_button("Registrar Emissão", use_container_width=True):
+                freq = st.session_state.get("freq_input_key")
+                erros = []
+                if not fiscal: erros.append("Fiscal")
+                if not freq or freq <= 0: erros.append("Frequência")
+                if not situacao: erros.append("Status")
+                
+                if erros: 
+                    st.error("Preencha os campos obrigatórios.")
+                    st.session_state.insert_success = None
+                else:
+                    dados_submit = {
+                        'Dia': dia, 'Hora': hora, 'Fiscal': fiscal, 'Local/Região': local,
+                        'Frequência em MHz': freq, 
+                        'Largura em kHz': larg if larg is not None else 0.0, # Evita erro se larg for vazio
+                        'Faixa de Frequência': faixa,
+                        'Identificação': ident, 'UTE?': ute, 'Processo SEI ou Ato UTE': proc,
+                        'Observações/Detalhes/Contatos': obs, 'Situação': situacao,
+                        'Autorizado? (Q)': 'Indefinido', 'Interferente?': interferente
+                    }
+                    if inserir_emissao_I_W(client, spread_id, dados_submit):
+                        st.session_state.insert_success = "Emissão inserida com sucesso. Caso queira continuar inserindo emissões desta entidade, basta alterar os dados específicos e clicar em Registrar Emissão."
+                        st.session_state.aba_conflito = None
+                        st.session_state.pop("lista_conflitos", None)
+                        st.rerun()
+
+    # --- PLANO DE FREQUÊNCIAS DE UMA ENTIDADE: CHECAGEM EM LOTE ---
+    @st.fragment
+    def _verificar_lista():
+        with st.expander("📋 Verificar lista de frequências", expanded="lista_conflitos" in st.session_state):
+            with st.form("form_lista_freq", border=False):
+                texto = st.text_area("Cole uma coluna de frequências (MHz), opcionalmente com a largura (kHz) ao lado",
+                                     height=160, placeholder="450,125\t12,5\n460,250\t25")
+                if st.form_submit_button("Verificar lista", use_container_width=True):
+                    lista, invalidas = _ler_lista_frequencias(texto)
+                    res = conflitos_frequencias(client, spread_id, lista["Frequência (MHz)"], lista["Largura (kHz)"])
+                    st.session_state.lista_conflitos = (res.assign(Linha=lista["Linha"].to_numpy()), invalidas)
+
+            if "lista_conflitos" not in st.session_state: return
+            res, invalidas = st.session_state.lista_conflitos
+            if invalidas:
+                st.warning(f"Linhas ignoradas (frequência inválida): {', '.join(map(str, invalidas))}")
+            if res.empty: return
+            st.caption(f"{len(res)} frequências | já constam: {int(res['Consta em'].notna().sum())} | "
+                       f"com sobreposição: {int((res['Sobreposições'] > 0).sum())} | "
+                       f"repetidas na lista: {int(res['Repetida na lista'].sum())}")
+            st.dataframe(
+                res[["Linha", "Frequência (MHz)", "Largura (kHz)", "Consta em", "Sobreposições", "Repetida na lista"]],
+                hide_index=True, use_container_width=True,
+                column_config={"Frequência (MHz)": st.column_config.NumberColumn(format="%.4f")},
+            )
+
+    _verificar_lista()
+    render_importacao_csv(client, spread_id)
 
     if botao_voltar(): 
         st.session_state.insert_success = None
+        for key in ["lista_conflitos", "importacao_previa", "importacao_medidas", "importacao_ok"]: st.session_state.pop(key, None)
         st.session_state.view = 'main_menu'
         st.rerun()
 
@@ -1459,6 +3106,34 @@ def tela_bsr_erb(client, spread_id):
         st.session_state.view = 'main_menu'
         st.rerun()
 
+def _titulo_resultado(row: pd.Series, i: int) -> str:
+    """Linha-resumo de um resultado da busca: Local | Data | Frequência | ID"""
+    cabecalho = []
+    aba_origem = row.get("Aba/Origem", "")
+    
+    # Tenta pegar Localização
+    loc = row.get("Local", row.get("Local/Região", row.get("Estação", "")))
+    if not loc or pd.isna(loc): loc = aba_origem
+    if loc: cabecalho.append(str(loc))
+    
+    # Tenta pegar Data
+    dt = row.get("Data", row.get("Dia", ""))
+    if dt and not pd.isna(dt): cabecalho.append(str(dt))
+    
+    # Tenta pegar Frequência
+    fr = row.get("Frequência (MHz)", row.get("Frequência", ""))
+    if fr and not pd.isna(fr): cabecalho.append(f"{fr} MHz")
+    
+    # ID
+    id_val = row.get("ID", "")
+    if id_val and not pd.isna(id_val): cabecalho.append(f"ID {id_val}")
+    
+    return " | ".join(cabecalho) if cabecalho else f"Resultado #{i}"
+
+def _limpar_busca():
+    for key in ['busca_res', 'busca_pagina']:
+        if key in st.session_state: del st.session_state[key]
+
 def tela_busca(client, spread_id):
     render_header()
     
@@ -1472,49 +3147,82 @@ def tela_busca(client, spread_id):
     
     abas_sel = st.multiselect("Abas:", abas_ops, default=abas_ops)
     
+    # --- FILTROS ESTRUTURADOS (aplicados sobre a base em cache) ---
+    with st.expander("Filtros (frequência, data, situação...)"):
+        base = carregar_base_busca(client, spread_id)
+        c1, c2 = st.columns(2)
+        f_min = c1.number_input("Frequência mín. (MHz)", value=None, min_value=0.0, format="%.3f")
+        f_max = c2.number_input("Frequência máx. (MHz)", value=None, min_value=0.0, format="%.3f")
+        periodo = st.date_input("Período", value=(), format="DD/MM/YYYY")
+        
+        def opcoes(coluna):
+            if base.empty or coluna not in base.columns: return []
+            return sorted(v for v in base[coluna].cat.categories if str(v).strip())
+        
+        situ_sel = st.multiselect("Situação", opcoes("Situação"))
+        ident_sel = st.multiselect("Identificação", opcoes("Identificação"))
+        inter_sel = st.multiselect("Interferente?", opcoes("Interferente?"))
+
+    filtros = {
+        "freq_min": f_min, "freq_max": f_max,
+        "data_ini": periodo[0] if len(periodo) > 0 else None,
+        "data_fim": periodo[1] if len(periodo) > 1 else (periodo[0] if len(periodo) > 0 else None),
+        "situacao": situ_sel, "identificacao": ident_sel, "interferente": inter_sel,
+    }
+    tem_filtro = any(v not in (None, []) for v in filtros.values())
+    
     if st.button("Consultar", use_container_width=True):
         termo_clean = termo.strip()
-        if len(termo_clean) < 3: 
-            st.warning("Digite pelo menos 3 caracteres para consultar.")
+        if len(termo_clean) < 3 and not tem_filtro: 
+            st.warning("Digite pelo menos 3 caracteres ou use um dos filtros para consultar.")
         else:
             with st.spinner("Buscando..."):
-                res = _buscar_por_texto_livre(client, spread_id, termo_clean, abas_sel)
-            
-            if res.empty: 
-                st.info("Nenhum resultado encontrado.")
-            else:
-                st.success(f"Resultados encontrados: {len(res)}")
-                
-                for i, (_, row) in enumerate(res.iterrows(), start=1):
-                    # --- LÓGICA DE CONSTRUÇÃO DO CABEÇALHO ---
-                    cabecalho = []
-                    aba_origem = row.get("Aba/Origem", "")
-                    
-                    # Tenta pegar Localização
-                    loc = row.get("Local", row.get("Local/Região", row.get("Estação", "")))
-                    if not loc and aba_origem: loc = aba_origem
-                    if loc: cabecalho.append(str(loc))
-                    
-                    # Tenta pegar Data
-                    dt = row.get("Data", row.get("Dia", ""))
-                    if dt: cabecalho.append(str(dt))
-                    
-                    # Tenta pegar Frequência
-                    fr = row.get("Frequência (MHz)", row.get("Frequência", ""))
-                    if fr: cabecalho.append(f"{fr} MHz")
-                    
-                    # ID
-                    id_val = row.get("ID", "")
-                    if id_val: cabecalho.append(f"ID {id_val}")
-                    
-                    titulo_expander = " | ".join(cabecalho) if cabecalho else f"Resultado #{i}"
+                # Resultado fica na sessão para a paginação sobreviver aos reruns
+                st.session_state.busca_res = _buscar_por_texto_livre(client, spread_id, termo_clean if len(termo_clean) >= 3 else "", abas_sel, filtros)
+                st.session_state.busca_pagina = 0
+
+    res = st.session_state.get('busca_res')
+    if res is not None:
+        if res.empty: 
+            st.info("Nenhum resultado encontrado.")
+        else:
+            st.success(f"Resultados encontrados: {len(res)}")
 
-                    with st.expander(titulo_expander):
-                        # Gera um prefixo único para os widgets não conflitarem
-                        key_prefix = f"busca_{i}_{id_val}"
-                        render_ocorrencia_readonly(row, key_prefix=key_prefix)
+            # --- PAGINAÇÃO ---
+            # Só a página atual vira linha-resumo e só o item escolhido vira formulário:
+            # o número de widgets por rerun fica limitado, qualquer que seja o total de resultados
+            total_paginas = (len(res) - 1) // BUSCA_POR_PAGINA + 1
+            pagina = min(st.session_state.get('busca_pagina', 0), total_paginas - 1)
+            
+            if total_paginas > 1:
+                c_ant, c_pag, c_prox = st.columns([1, 2, 1])
+                if c_ant.button("⬅️", use_container_width=True, disabled=pagina == 0, key="busca_ant"):
+                    st.session_state.busca_pagina = pagina - 1; st.rerun()
+                c_pag.markdown(f"<p style='text-align: center;'>Página {pagina + 1} de {total_paginas}</p>", unsafe_allow_html=True)
+                if c_prox.button("➡️", use_container_width=True, disabled=pagina >= total_paginas - 1, key="busca_prox"):
+                    st.session_state.busca_pagina = pagina + 1; st.rerun()
+
+            inicio = pagina * BUSCA_POR_PAGINA
+            pagina_df = res.iloc[inicio:inicio + BUSCA_POR_PAGINA]
+            titulos = [_titulo_resultado(row, i) for i, (_, row) in enumerate(pagina_df.iterrows(), start=inicio + 1)]
+            
+            st.dataframe(
+                pd.DataFrame({"#": range(inicio + 1, inicio + len(titulos) + 1), "Resultado": titulos}),
+                hide_index=True, use_container_width=True
+            )
+            
+            escolhido = st.selectbox(
+                "Ver detalhes:", range(len(titulos)), index=None, placeholder="Escolha um resultado...",
+                format_func=lambda k: f"#{inicio + k + 1} - {titulos[k]}", key=f"busca_detalhe_{pagina}"
+            )
+            if escolhido is not None:
+                row = pagina_df.iloc[escolhido]
+                with st.container(border=True):
+                    # Gera um prefixo único para os widgets não conflitarem
+                    render_ocorrencia_readonly(row, key_prefix=f"busca_{inicio + escolhido}_{row.get('ID', '')}")
 
     if botao_voltar(key="voltar_busca"): 
+        _limpar_busca()
         st.session_state.view = 'main_menu'
         st.rerun()
 
@@ -1574,7 +3282,8 @@ def tela_tabela_ute(client, spread_id):
         
         if coluna_ordem == "Frequência (MHz)":
             # Converte a string da frequência para número, trocando vírgula por ponto, para ordenar corretamente
-            df['_ordem_temp'] = pd.to_numeric(df['Frequência (MHz)'].astype(str).str.replace(',', '.'), errors='coerce').fillna(0)
+            # (assign: o DataFrame do cache é compartilhado e não pode ganhar colunas)
+            df = df.assign(_ordem_temp=pd.to_numeric(df['Frequência (MHz)'].astype(str).str.replace(',', '.'), errors='coerce').fillna(0))
             df = df.sort_values(by='_ordem_temp', ascending=ascendente)
             df = df.drop(columns=['_ordem_temp'])
         else:
@@ -1605,16 +3314,159 @@ def tela_tabela_ute(client, spread_id):
     
     if botao_voltar(): st.session_state.view = 'main_menu'; st.rerun()
 
+def tela_espectro(client, spread_id):
+    render_header()
+    st.markdown('<div class="info-green">O que já é conhecido numa faixa de frequências (todas as abas do evento).</div>', unsafe_allow_html=True)
+
+    c1, c2 = st.columns(2)
+    f_ini = c1.number_input(f"De (MHz) {OBRIG}", value=None, min_value=0.0, format="%.3f", key="esp_ini")
+    f_fim = c2.number_input(f"Até (MHz) {OBRIG}", value=None, min_value=0.0, format="%.3f", key="esp_fim")
+
+    if st.button("Consultar faixa", use_container_width=True):
+        if f_ini is None or f_fim is None or f_fim < f_ini:
+            st.warning("Informe uma faixa válida (início menor ou igual ao fim).")
+        else:
+            with st.spinner("Montando índice espectral..."):
+                indice = carregar_indice_espectro(client, spread_id)
+            ocup = consultar_ocupacao(indice, f_ini, f_fim)
+            
+            if ocup.empty:
+                st.info("Nenhum registro conhecido nessa faixa.")
+            else:
+                st.success(f"Registros na faixa: {len(ocup)}")
+                st.dataframe(
+                    ocup[["Frequência (MHz)", "Largura (kHz)", "Origem", "Local", "ID", "Situação"]],
+                    hide_index=True, use_container_width=True,
+                    column_config={"Frequência (MHz)": st.column_config.NumberColumn(format="%.4f")},
+                )
+
+    if botao_voltar(key="voltar_espectro"):
+        st.session_state.view = 'main_menu'
+        st.rerun()
+
+def tela_exportar(client, spread_id):
+    render_header()
+    st.markdown('<div class="info-green">Exporte todas as abas do evento para o relatório pós-evento.</div>', unsafe_allow_html=True)
+
+    if st.button("Gerar arquivos", use_container_width=True):
+        with st.spinner("Baixando e organizando as abas..."):
+            try:
+                dados = carregar_exportacao_evento(client, spread_id)
+                st.session_state.export_arquivos = _gerar_arquivos_exportacao(dados)
+                st.session_state.export_linhas = {k: len(v) for k, v in dados.items()}
+            except Exception as e:
+                st.error(f"Erro ao exportar: {e}")
+
+    arquivos = st.session_state.get('export_arquivos')
+    if arquivos:
+        linhas = st.session_state.get('export_linhas', {})
+        st.caption(" | ".join(f"{k}: {v} linhas" for k, v in linhas.items()))
+        nome_base = _normalize_text(st.session_state.get('evento_nome', 'evento')).replace(" ", "_") or "evento"
+        st.download_button("⬇️ Emissões (Parquet)", arquivos[0], file_name=f"{nome_base}_emissoes.parquet",
+                           mime="application/octet-stream", use_container_width=True)
+        st.download_button("⬇️ Todas as tabelas (CSV em ZIP)", arquivos[1], file_name=f"{nome_base}.zip",
+                           mime="application/zip", use_container_width=True)
+
+    if botao_voltar(key="voltar_exportar"):
+        for key in ['export_arquivos', 'export_linhas']:
+            if key in st.session_state: del st.session_state[key]
+        st.session_state.view = 'main_menu'
+        st.rerun()
+
+def tela_painel_eventos(client):
+    render_header()
+    st.markdown('<div class="info-green">Resumo de todos os eventos de Monitoração.</div>', unsafe_allow_html=True)
+
+    try:
+        eventos = listar_eventos(client)
+    except Exception as e:
+        st.error(f"Erro ao listar arquivos: {e}"); eventos = []
+
+    # Cada evento é calculado no pool do painel (2 por vez); só recalcula quem teve modifiedTime alterado
+    # ou cujo cálculo falhou (o próximo ciclo do fragmento submete de novo)
+    futuros = st.session_state.setdefault('painel_futuros', {})
+
+    def _falhou(fut):
+        return fut.done() and (fut.exception() is not None or fut.result() is None)
+
+    def _futuro(ev):
+        chave = (ev["id"], ev["modificado"])
+        fut = futuros.get(chave)
+        if fut is None or _falhou(fut):
+            fut = futuros[chave] = _submeter(_resumo_seguro, client, ev, executor=_obter_executor_painel())
+        return fut
+
+    def _calculando(fut):
+        return not fut.done() or _falhou(fut)
+
+    pendentes = [ev for ev in eventos if _calculando(_futuro(ev))]
+
+    @st.fragment(run_every=2 if pendentes else None)
+    def _tabela():
+        linhas, faixas = [], {}
+        ainda_calculando = False
+        for ev in eventos:
+            fut = _futuro(ev)
+            if _calculando(fut):
+                ainda_calculando = True
+                linhas.append({"Evento": ev["nome"], "Pendências": None, "Emissões": None, "Interferentes": None, "Atos UTE": None})
+                continue
+            r = fut.result()
+            linhas.append({"Evento": ev["nome"], "Pendências": r.get("pendentes"), "Emissões": r.get("emissoes"),
+                           "Interferentes": r.get("interferentes"), "Atos UTE": r.get("atos_ute")})
+            faixas[ev["nome"]] = r.get("por_faixa", {})
+
+        if ainda_calculando:
+            st.caption(f"Calculando... ({sum(1 for l in linhas if l['Emissões'] is not None)}/{len(linhas)} eventos prontos)")
+        elif pendentes:
+            st.rerun()  # tudo pronto: redesenha a tela sem o auto-refresh
+        
+        if linhas:
+            st.dataframe(pd.DataFrame(linhas), hide_index=True, use_container_width=True)
+        if faixas:
+            st.markdown("##### Emissões por Faixa")
+            st.dataframe(pd.DataFrame(faixas).T.fillna(0).astype(int), use_container_width=True)
+
+    _tabela()
+
+    if botao_voltar(label="⬅️ Voltar", key="voltar_painel_eventos"):
+        st.session_state.view = 'selecao'
+        st.rerun()
+
+def render_perfil():
+    """Painel de diagnóstico (?perfil=1): tempos desta execução e custos de inicialização do processo"""
+    with st.expander("⏱️ Perfil de inicialização", expanded=True):
+        st.markdown("**Esta execução** (ms desde o início do script)")
+        st.markdown("\n".join(f"- {etapa}: {ms}" for etapa, ms in _PERFIL_EXECUCAO))
+        st.markdown("**Processo** (custo de cada carga, ms)")
+        etapas = dict(_perfil_processo()["etapas"])
+        st.markdown("\n".join(f"- {etapa}: {ms}" for etapa, ms in etapas.items()) or "- nada carregado ainda")
+
+        tabela, totais = relatorio_memoria_caches()
+        st.markdown(f"**Memória dos caches**: {totais['MB']} de {CACHE_LIMITE_MB:g} MB, "
+                    f"até {CACHE_EVENTOS_RESIDENTES} eventos residentes")
+        st.caption(f"Acertos: {totais['acertos']} | faltas: {totais['faltas']} | despejos: "
+                   + (", ".join(f"{m} {n}" for m, n in totais["despejos"].items()) or "nenhum"))
+        if not tabela.empty:
+            try: nomes = {ev["id"]: ev["nome"] for ev in listar_eventos(client_g)}
+            except Exception: nomes = {}
+            st.dataframe(tabela.assign(Evento=tabela["Evento"].map(lambda i: nomes.get(i, i))),
+                         hide_index=True, use_container_width=True)
+
 # =========================== MAIN ===========================
 try:
+    _aquecer_processo()
     client_g = obter_cliente_gspread()
+    _marcar("cliente gspread")
     
     # Inicializa estados
     if 'view' not in st.session_state: st.session_state.view = 'selecao'
     if 'spreadsheet_id' not in st.session_state: st.session_state.spreadsheet_id = None
 
     # Roteamento
-    if st.session_state.view == 'selecao' or not st.session_state.spreadsheet_id:
+    if st.session_state.view == 'painel_eventos':
+        tela_painel_eventos(client_g)
+    elif st.session_state.view == 'selecao' or not st.session_state.spreadsheet_id:
         tela_selecao_evento(client_g)
     else:
         sp_id = st.session_state.spreadsheet_id
@@ -1625,6 +3477,11 @@ try:
         elif st.session_state.view == 'bsr_erb': tela_bsr_erb(client_g, sp_id)
         elif st.session_state.view == 'busca': tela_busca(client_g, sp_id)
         elif st.session_state.view == 'tabela_ute': tela_tabela_ute(client_g, sp_id)
+        elif st.session_state.view == 'espectro': tela_espectro(client_g, sp_id)
+        elif st.session_state.view == 'exportar': tela_exportar(client_g, sp_id)
+
+    _marcar(f"tela '{st.session_state.view}'")
+    if st.query_params.get("perfil") == "1": render_perfil()
 
 except Exception as e:
     st.error("Erro fatal na aplicação.")
@@ -0,0 +1,132 @@
+"""
+Gera (e verifica) a grade de fusos horários do Brasil usada por abordagem.py.
+
+A grade cobre o retângulo LAT_MIN..LAT_MAX x LON_MIN..LON_MAX em células de PASSO graus.
+Cada célula guarda um byte: o índice (1..N) do fuso IANA brasileiro que cobre a célula
+inteira, ou 0 quando a célula toca fronteira de fuso, país estrangeiro ou oceano — nesses
+casos o app recorre ao TimezoneFinder.
+
+Uso:
+    python gerar_grade_fusos.py              # gera fusos_brasil.bin
+    python gerar_grade_fusos.py --verificar  # compara a grade com o TimezoneFinder
+"""
+import json
+import random
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+from timezonefinder import TimezoneFinder
+
+ARQUIVO = Path(__file__).with_name("fusos_brasil.bin")
+MAGICO = b"FUSOBR1\0"
+
+LAT_MIN, LAT_MAX = -34.0, 5.5
+LON_MIN, LON_MAX = -74.0, -28.5   # até Trindade e Martim Vaz
+PASSO = 0.1
+AMOSTRAS = 5                      # amostras por lado de cada célula (inclui as bordas)
+
+FUSOS_BRASIL = [
+    "America/Sao_Paulo", "America/Bahia", "America/Fortaleza", "America/Recife",
+    "America/Maceio", "America/Belem", "America/Araguaina", "America/Santarem",
+    "America/Noronha", "America/Cuiaba", "America/Campo_Grande", "America/Manaus",
+    "America/Porto_Velho", "America/Boa_Vista", "America/Eirunepe", "America/Rio_Branco",
+]
+
+
+def _dimensoes():
+    linhas = round((LAT_MAX - LAT_MIN) / PASSO)
+    colunas = round((LON_MAX - LON_MIN) / PASSO)
+    return linhas, colunas
+
+
+def gerar():
+    tf = TimezoneFinder()
+    codigo = {f: i + 1 for i, f in enumerate(FUSOS_BRASIL)}
+    linhas, colunas = _dimensoes()
+
+    # Amostra os vértices de uma malha AMOSTRAS-1 vezes mais fina que a grade;
+    # vértices vizinhos são compartilhados entre células adjacentes
+    fino = AMOSTRAS - 1
+    n_lat, n_lon = linhas * fino + 1, colunas * fino + 1
+    malha = np.zeros((n_lat, n_lon), dtype=np.uint8)
+    for i in range(n_lat):
+        lat = LAT_MIN + i * PASSO / fino
+        for j in range(n_lon):
+            lon = LON_MIN + j * PASSO / fino
+            malha[i, j] = codigo.get(tf.timezone_at(lng=lon, lat=lat), 0)
+        if i % 200 == 0:
+            print(f"  linha {i}/{n_lat}", file=sys.stderr)
+
+    grade = np.zeros((linhas, colunas), dtype=np.uint8)
+    for i in range(linhas):
+        for j in range(colunas):
+            bloco = malha[i * fino:(i + 1) * fino + 1, j * fino:(j + 1) * fino + 1]
+            if bloco.min() == bloco.max():
+                grade[i, j] = bloco[0, 0]
+
+    # Margem de segurança: só vale a célula cujas 8 vizinhas têm o mesmo fuso
+    # (fronteiras que passam entre amostras ficam com o TimezoneFinder)
+    seguro = grade.copy()
+    borda = np.pad(grade, 1, constant_values=0)
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            vizinha = borda[1 + di:1 + di + linhas, 1 + dj:1 + dj + colunas]
+            seguro[vizinha != grade] = 0
+
+    cabecalho = json.dumps({
+        "lat_min": LAT_MIN, "lon_min": LON_MIN, "passo": PASSO,
+        "linhas": linhas, "colunas": colunas, "fusos": FUSOS_BRASIL,
+    }).encode("utf-8")
+    dados = zlib.compress(seguro.tobytes(), 9)
+    ARQUIVO.write_bytes(MAGICO + struct.pack("<I", len(cabecalho)) + cabecalho + dados)
+
+    cobertas = int((seguro > 0).sum())
+    print(f"{ARQUIVO.name}: {linhas}x{colunas} células, {cobertas} resolvidas sem TimezoneFinder, "
+          f"{ARQUIVO.stat().st_size} bytes")
+
+
+def verificar(passo=0.037, aleatorios=200_000):
+    """Toda resposta da grade, consultada pelo próprio abordagem._fuso_pela_grade, tem de coincidir com o TimezoneFinder"""
+    import abordagem
+
+    # Aponta o app para o arquivo recém-gerado e descarta a grade que ele já tenha carregado
+    abordagem.ARQUIVO_GRADE_FUSOS = ARQUIVO
+    abordagem._grade_fusos.clear()
+    if abordagem._grade_fusos() is None:
+        print(f"{ARQUIVO.name}: o app não conseguiu ler a grade")
+        return False
+
+    tf = TimezoneFinder()
+    pontos = [(LAT_MIN + a * passo, LON_MIN + b * passo)
+              for a in range(int((LAT_MAX - LAT_MIN) / passo))
+              for b in range(int((LON_MAX - LON_MIN) / passo))]
+    sorteio = random.Random(45)
+    pontos += [(sorteio.uniform(LAT_MIN - 1, LAT_MAX + 1), sorteio.uniform(LON_MIN - 1, LON_MAX + 1))
+               for _ in range(aleatorios)]
+    # Locais de eventos conhecidos
+    pontos += [(-15.7939, -47.8828), (-22.9068, -43.1729), (-23.5505, -46.6333), (-3.1190, -60.0217),
+               (-12.9714, -38.5014), (-30.0346, -51.2177), (-9.9754, -67.8249), (-3.8547, -32.4247)]
+
+    divergentes, resolvidos = [], 0
+    for lat, lon in pontos:
+        fuso = abordagem._fuso_pela_grade(lat, lon)
+        if fuso is None:
+            continue
+        resolvidos += 1
+        esperado = tf.timezone_at(lng=lon, lat=lat)
+        if fuso != esperado:
+            divergentes.append((lat, lon, fuso, esperado))
+
+    print(f"{len(pontos)} pontos, {resolvidos} resolvidos pela grade, {len(divergentes)} divergentes")
+    for d in divergentes[:20]:
+        print("  ", d)
+    return not divergentes
+
+
+if __name__ == "__main__":
+    if "--verificar" in sys.argv:
+        sys.exit(0 if verificar() else 1)
+    gerar()
@@ -0,0 +1,90 @@
+"""Testes das funções puras do app (rodar com: python -m pytest -q)"""
+import io
+
+import pandas as pd
+import pytest
+
+import abordagem as app
+
+
+def _csv(texto: str):
+    arquivo = io.BytesIO(texto.encode("utf-8"))
+    arquivo.file_id = "teste"
+    return arquivo
+
+
+# ---------- datas ----------
+
+def test_para_momento_le_iso_sem_trocar_dia_e_mes():
+    datas = app._para_momento(pd.Series(["2024-05-01 10:00:00", "2024-05-01T10:30"]))
+    assert list(datas) == [pd.Timestamp("2024-05-01 10:00"), pd.Timestamp("2024-05-01 10:30")]
+
+
+def test_para_momento_le_dia_primeiro_fora_do_iso():
+    datas = app._para_momento(pd.Series(["01/05/2024 10:00", "13/05/2024", ""]))
+    assert datas[0] == pd.Timestamp("2024-05-01 10:00")
+    assert datas[1] == pd.Timestamp("2024-05-13")
+    assert pd.isna(datas[2])
+
+
+def test_para_data_aceita_planilha_e_iso():
+    datas = app._para_data(pd.Series(["01/05/2024", "2024-05-02", "lixo"]))
+    assert datas[0] == pd.Timestamp("2024-05-01")
+    assert datas[1] == pd.Timestamp("2024-05-02")
+    assert pd.isna(datas[2])
+
+
+@pytest.mark.parametrize("momento, esperado", [
+    ("2024-05-01 10:00:00", pd.Timestamp("2024-05-01 10:00")),
+    ("01/05/2024 10:00:00", pd.Timestamp("2024-05-01 10:00")),
+])
+def test_ler_csv_medicoes_momento(momento, esperado):
+    arquivo = _csv(f"Timestamp;Frequency (Hz)\n{momento};450125000\n")
+    mapa = app._detectar_colunas_csv(app.colunas_csv(arquivo))
+    medidas = app.ler_csv_medicoes(arquivo, mapa, "Hz")
+    assert medidas["Momento"].tolist() == [esperado]
+    assert medidas["Frequência (MHz)"].tolist() == [450.125]
+
+
+# ---------- índice de linhas e gravação por ID ----------
+
+class _PlanilhaIds:
+    """Só a coluna de IDs (A, a partir da linha 2) de uma aba; registra as escritas em lote"""
+    def __init__(self, ids):
+        self.ids, self.escritas = ids, []
+
+    def values_get(self, intervalo):
+        return {"values": [[i] for i in self.ids]}
+
+    def values_batch_get(self, intervalos):
+        return {"valueRanges": [{} for _ in intervalos]}
+
+    def values_batch_update(self, corpo):
+        self.escritas.extend(corpo["data"])
+
+
+def test_indice_linhas_ignora_id_vazio_e_marca_repetido():
+    df = pd.DataFrame({
+        "Fonte": ["ABORDAGEM", "ABORDAGEM", "ESTACAO", "ESTACAO", "ESTACAO", "PAINEL"],
+        "EstacaoRaw": ["ABORDAGEM", "ABORDAGEM", "RFeye 01", "RFeye 01", "RFeye 01", "RFeye 01"],
+        "ID": ["Abo-01", "", "R-1", "R-1", "R-2", "R-2"],
+        "_linha": [2, 3, 5, 9, 7, 4],
+    })
+    indice = app._indice_linhas(df)
+    assert indice == {("Abordagem", "Abo-01"): 2, ("RFeye 01", "R-1"): app.LINHA_DUPLICADA, ("RFeye 01", "R-2"): 7}
+
+
+def test_gravar_por_id_recusa_id_repetido():
+    planilha = _PlanilhaIds(["R-1", "R-2", "R-1"])
+    linha, conflitos, _ = app._gravar_por_id(planilha, "RFeye 01", "A", 2, "R-1", None, {"P": "Concluído"})
+    assert linha == app.LINHA_DUPLICADA and not conflitos
+    linha, _, _ = app._gravar_por_id(planilha, "RFeye 01", "A", 2, "R-1", app.LINHA_DUPLICADA, {"P": "Concluído"})
+    assert linha == app.LINHA_DUPLICADA
+    assert planilha.escritas == []
+
+
+def test_gravar_por_id_grava_id_unico():
+    planilha = _PlanilhaIds(["R-1", "R-2", "R-1"])
+    linha, _, _ = app._gravar_por_id(planilha, "RFeye 01", "A", 2, "R-2", None, {"P": "Concluído"})
+    assert linha == 3
+    assert [d["range"] for d in planilha.escritas] == [app._intervalo("RFeye 01", "P3")]